@@ -1,11 +1,14 @@
 from .game import Game
+from .board import Board
+from .position import Position
 
 # from .board import MoveRecord
 
 
 class API:
-    def __init__(self):
-        self.g = Game()
+    def __init__(self, board_class=Board):
+        # board_class=BitboardBoard (from .bitboard) swaps the board representation
+        self.g = Game(board_class)
 
     def get_state(self):
         return {
@@ -15,9 +18,34 @@ class API:
             "result": self.g.result,
         }
 
+    def get_fen(self):
+        return self.g.to_fen()
+
+    def load_fen(self, fen):
+        # raises ValueError on a bad fen, the game is left as it was
+        game = Game(type(self.g.board))
+        game.load_fen(fen)
+        self.g = game
+
+    def get_hash(self):
+        # 64-bit zobrist key of the current position, side to move included
+        return self.g.board.hash
+
+    def position(self):
+        # search view of the current position, see position.py. it plays on the
+        # game's board, so pop every push before committing a move
+        g = self.g
+        return Position(g.board, g.turn, g.halfmove_clock)
+
     def get_legal_moves(self):
         return self.g.legal_moves()
 
+    def get_legal_moves_packed(self):
+        return self.g.legal_moves_packed()
+
+    def is_legal(self, move):
+        return self.g.is_legal(move)
+
     def make_move(self, move):
         return self.g.make_move(move)
 
@@ -26,7 +54,20 @@ class API:
 
     def undo_move(self, move, record):
         return self.g.board.undo_move(move, record)
+
+    def apply_packed(self, packed):
+        return self.g.board.apply_packed(packed)
+
+    def undo_packed(self, packed, record):
+        return self.g.board.undo_packed(packed, record)
     
+    def apply_null(self):
+        # pass the turn on the board, returns what undo_null needs
+        return self.g.board.apply_null()
+
+    def undo_null(self, ep_square):
+        self.g.board.undo_null(ep_square)
+
     def undo(self):
         return self.g.undo()
     
@@ -0,0 +1,386 @@
+from .board import Board, MoveRecord
+from .board import WPAWN, WKNIGHT, WBISHOP, WROOK, WQUEEN, WKING
+from .board import BPAWN, BKNIGHT, BBISHOP, BROOK, BQUEEN, BKING
+from .board import EMPTY
+from .board import WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG
+from .tables import KNIGHT_TARGETS, KING_TARGETS, WPAWN_TARGETS, BPAWN_TARGETS
+from .tables import ray_squares, to_mask, MOVES
+from .moves import SQUARE_MASK
+from .moves import CAPTURE, EN_PASSANT, CASTLE, PROMOTION, DOUBLE_PUSH
+
+# squares are numbered x * 8 + y, so a8 = 0, h8 = 7, a1 = 56, h1 = 63.
+# bitboards are plain python ints where bit n is set if square n is occupied.
+
+
+def _mask_table(targets):
+    return [to_mask(targets[sq >> 3][sq & 7]) for sq in range(64)]
+
+
+def _ray_table(dx, dy):
+    return [to_mask(ray_squares(sq >> 3, sq & 7, dx, dy)) for sq in range(64)]
+
+
+KNIGHT_ATTACKS = _mask_table(KNIGHT_TARGETS)
+KING_ATTACKS = _mask_table(KING_TARGETS)
+# squares attacked BY a pawn of the given colour standing on the square
+WPAWN_ATTACKS = _mask_table(WPAWN_TARGETS)
+BPAWN_ATTACKS = _mask_table(BPAWN_TARGETS)
+
+# (ray table, True if the ray walks towards higher square numbers)
+BISHOP_RAYS = [
+    (_ray_table(-1, -1), False),
+    (_ray_table(-1, 1), False),
+    (_ray_table(1, -1), True),
+    (_ray_table(1, 1), True),
+]
+ROOK_RAYS = [
+    (_ray_table(-1, 0), False),
+    (_ray_table(1, 0), True),
+    (_ray_table(0, -1), False),
+    (_ray_table(0, 1), True),
+]
+
+
+def _sliding_attacks(sq, occupied, rays):
+    attacks = 0
+    for table, positive in rays:
+        ray = table[sq]
+        blockers = ray & occupied
+        if blockers:
+            # nearest blocker is the lowest bit going up, the highest going down
+            if positive:
+                nearest = (blockers & -blockers).bit_length() - 1
+            else:
+                nearest = blockers.bit_length() - 1
+            ray ^= table[nearest]
+        attacks |= ray
+    return attacks
+
+
+def bishop_attacks(sq, occupied):
+    return _sliding_attacks(sq, occupied, BISHOP_RAYS)
+
+
+def rook_attacks(sq, occupied):
+    return _sliding_attacks(sq, occupied, ROOK_RAYS)
+
+
+def queen_attacks(sq, occupied):
+    return _sliding_attacks(sq, occupied, BISHOP_RAYS) | _sliding_attacks(
+        sq, occupied, ROOK_RAYS
+    )
+
+
+def _squares(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+class BitboardBoard(Board):
+    # keeps one bitboard per piece code (indexed by piece + 6) and an occupancy
+    # mask per colour. a flat 64 entry mailbox is kept alongside so that
+    # "what is on this square" stays a single list lookup.
+
+    def __init__(self):
+        self._matrix = None
+        super().__init__()
+
+    @property
+    def board(self):
+        # 8x8 matrix view, rebuilt lazily after the position changes.
+        # treat it as read only, assign a whole new matrix to change the board.
+        if self._matrix is None:
+            s = self.squares
+            self._matrix = [s[i : i + 8] for i in range(0, 64, 8)]
+        return self._matrix
+
+    @board.setter
+    def board(self, matrix):
+        self.squares = [piece for row in matrix for piece in row]
+        self.bb = [0] * 13
+        self.white = 0
+        self.black = 0
+        for sq, piece in enumerate(self.squares):
+            if piece != EMPTY:
+                self._put(sq, piece)
+        self._matrix = None
+
+    def pieces(self, piece):
+        return self.bb[piece + 6]
+
+    def occupied(self):
+        return self.white | self.black
+
+    def piece_at(self, sq):
+        return self.squares[sq]
+
+    def has_pieces(self, white):
+        bb = self.bb
+        if white:
+            return any(bb[WKNIGHT + 6 : WQUEEN + 7])
+        return any(bb[BQUEEN + 6 : BKNIGHT + 7])
+
+    def _put(self, sq, piece):
+        bit = 1 << sq
+        self.squares[sq] = piece
+        self.bb[piece + 6] |= bit
+        if piece > 0:
+            self.white |= bit
+        else:
+            self.black |= bit
+
+    def _remove(self, sq, piece):
+        bit = 1 << sq
+        self.squares[sq] = EMPTY
+        self.bb[piece + 6] ^= bit
+        if piece > 0:
+            self.white ^= bit
+        else:
+            self.black ^= bit
+
+    def apply_move(self, move):
+        from_sq, to_sq = move
+        (fx, fy), (tx, ty) = from_sq, to_sq
+        frm = fx * 8 + fy
+        to = tx * 8 + ty
+
+        original_piece = self.squares[frm]
+        captured = self.squares[to]
+
+        if captured != EMPTY:
+            self._remove(to, captured)
+        self._remove(frm, original_piece)
+        self._put(to, original_piece)
+
+        en_passant = False
+
+        if original_piece == WKING:
+            self.wking_pos = (tx, ty)
+        elif original_piece == BKING:
+            self.bking_pos = (tx, ty)
+
+        # HANDLE EN PASSANT
+        elif captured == EMPTY and abs(original_piece) == WPAWN and fy != ty:
+            victim_sq = to + 8 * original_piece
+            captured = self.squares[victim_sq]
+            self._remove(victim_sq, captured)
+            en_passant = True
+
+        # HANDLE CASTLING
+        if abs(original_piece) == WKING and abs(fy - ty) == 2:
+            row = fx * 8
+            if ty == 6:
+                rook = self.squares[row + 7]
+                self._remove(row + 7, rook)
+                self._put(row + 5, rook)
+            elif ty == 2:
+                rook = self.squares[row]
+                self._remove(row, rook)
+                self._put(row + 3, rook)
+
+        promotion = None
+        if original_piece == WPAWN and tx == 0:
+            promotion = WQUEEN
+        elif original_piece == BPAWN and tx == 7:
+            promotion = BQUEEN
+        if promotion is not None:
+            self._remove(to, original_piece)
+            self._put(to, promotion)
+
+        self._matrix = None
+
+        record = MoveRecord(
+            moved_piece=original_piece,
+            captured_piece=captured,
+            promotion=promotion,
+            from_sq=from_sq,
+            to_sq=to_sq,
+            en_passant=en_passant,
+            castling=self.castling,
+            ep_square=self.ep_square,
+        )
+        self.update_state(record)
+        return record
+
+    def undo_move(self, move, move_record):
+        (fx, fy), (tx, ty) = move
+        frm = fx * 8 + fy
+        to = tx * 8 + ty
+        moved = move_record.moved_piece
+
+        self._remove(to, self.squares[to])
+        self._put(frm, moved)
+
+        if moved == WKING:
+            self.wking_pos = (fx, fy)
+        elif moved == BKING:
+            self.bking_pos = (fx, fy)
+
+        # CASTLING UNDO
+        if abs(moved) == WKING and abs(fy - ty) == 2:
+            row = fx * 8
+            if ty == 6:
+                rook = self.squares[row + 5]
+                self._remove(row + 5, rook)
+                self._put(row + 7, rook)
+            elif ty == 2:
+                rook = self.squares[row + 3]
+                self._remove(row + 3, rook)
+                self._put(row, rook)
+
+        # ENPASSANT UNDO
+        elif move_record.en_passant:
+            self._put(to + 8 * moved, move_record.captured_piece)
+
+        elif move_record.captured_piece != EMPTY:
+            self._put(to, move_record.captured_piece)
+
+        self._matrix = None
+        self.revert_state(move_record)
+
+
+def bb_attacked(board, sq, by_white, occupied=None, removed=0):
+    # `occupied` and `removed` let the caller test a position that has not been
+    # played on the board yet: `removed` masks out enemy pieces that got captured.
+    bb = board.bb
+    if occupied is None:
+        occupied = board.white | board.black
+    keep = ~removed
+    if by_white:
+        if BPAWN_ATTACKS[sq] & bb[WPAWN + 6] & keep:
+            return True
+        if KNIGHT_ATTACKS[sq] & bb[WKNIGHT + 6] & keep:
+            return True
+        if KING_ATTACKS[sq] & bb[WKING + 6]:
+            return True
+        queens = bb[WQUEEN + 6]
+        diagonal = (bb[WBISHOP + 6] | queens) & keep
+        straight = (bb[WROOK + 6] | queens) & keep
+    else:
+        if WPAWN_ATTACKS[sq] & bb[BPAWN + 6] & keep:
+            return True
+        if KNIGHT_ATTACKS[sq] & bb[BKNIGHT + 6] & keep:
+            return True
+        if KING_ATTACKS[sq] & bb[BKING + 6]:
+            return True
+        queens = bb[BQUEEN + 6]
+        diagonal = (bb[BBISHOP + 6] | queens) & keep
+        straight = (bb[BROOK + 6] | queens) & keep
+    if diagonal and bishop_attacks(sq, occupied) & diagonal:
+        return True
+    if straight and rook_attacks(sq, occupied) & straight:
+        return True
+    return False
+
+
+def bb_square_attacked(board, x, y, by_white):
+    return bb_attacked(board, x * 8 + y, by_white)
+
+
+def bb_legal_moves(board, color, captures=True, quiets=True):
+    return [
+        MOVES[m & SQUARE_MASK]
+        for m in bb_legal_moves_packed(board, color, captures, quiets)
+    ]
+
+
+def bb_legal_moves_packed(board, color, captures=True, quiets=True):
+    # captures / quiets pick which half of the moves to generate, en passant
+    # counts as a capture and castling as a quiet move
+    white = color == "white"
+    bb = board.bb
+    own = board.white if white else board.black
+    enemy = board.black if white else board.white
+    occupied = own | enemy
+    targets = (enemy if captures else 0) | (~occupied if quiets else 0)
+    sign = 1 if white else -1
+    king_sq = bb[WKING * sign + 6].bit_length() - 1
+
+    moves = []
+
+    def add_if_legal(frm, to, removed, flags):
+        # play the move on the occupancy masks only and look at the king
+        occ = (occupied ^ (1 << frm)) | (1 << to)
+        if not bb_attacked(board, king_sq, not white, occ, removed):
+            moves.append(frm | (to << 6) | flags)
+
+    # PAWNS
+    forward = -8 if white else 8
+    start_rank = 6 if white else 1
+    last_rank = 0 if white else 7
+    attacks_table = WPAWN_ATTACKS if white else BPAWN_ATTACKS
+    for frm in _squares(bb[WPAWN * sign + 6]):
+        to = frm + forward
+        promotion = PROMOTION if to >> 3 == last_rank else 0
+        if quiets and not (occupied >> to) & 1:
+            add_if_legal(frm, to, 0, promotion)
+            if frm >> 3 == start_rank:
+                to2 = to + forward
+                if not (occupied >> to2) & 1:
+                    add_if_legal(frm, to2, 0, DOUBLE_PUSH)
+        if captures:
+            for to in _squares(attacks_table[frm] & enemy):
+                add_if_legal(frm, to, 1 << to, CAPTURE | promotion)
+
+    # KNIGHTS
+    for frm in _squares(bb[WKNIGHT * sign + 6]):
+        for to in _squares(KNIGHT_ATTACKS[frm] & targets):
+            captured = (1 << to) & enemy
+            add_if_legal(frm, to, captured, CAPTURE if captured else 0)
+
+    # BISHOPS, ROOKS, QUEENS
+    for piece, attacks in [
+        (WBISHOP, bishop_attacks),
+        (WROOK, rook_attacks),
+        (WQUEEN, queen_attacks),
+    ]:
+        for frm in _squares(bb[piece * sign + 6]):
+            for to in _squares(attacks(frm, occupied) & targets):
+                captured = (1 << to) & enemy
+                add_if_legal(frm, to, captured, CAPTURE if captured else 0)
+
+    # KING, the attack test runs with the king lifted off its square
+    without_king = occupied ^ (1 << king_sq)
+    for to in _squares(KING_ATTACKS[king_sq] & targets):
+        captured = (1 << to) & enemy
+        if not bb_attacked(board, to, not white, without_king, captured):
+            moves.append(king_sq | (to << 6) | (CAPTURE if captured else 0))
+
+    # EN PASSANT LOGIC
+    if captures and board.ep_square is not None:
+        ex, ey = board.ep_square
+        to = ex * 8 + ey
+        victim = to - forward
+        if board.squares[victim] == -WPAWN * sign:
+            # own pawns that attack the target square
+            capturers = (BPAWN_ATTACKS if white else WPAWN_ATTACKS)[to]
+            for frm in _squares(capturers & bb[WPAWN * sign + 6]):
+                occ = (occupied ^ (1 << frm) ^ (1 << victim)) | (1 << to)
+                if not bb_attacked(board, king_sq, not white, occ, 1 << victim):
+                    moves.append(frm | (to << 6) | CAPTURE | EN_PASSANT)
+
+    # CASTLING LOGIC
+    row = 7 if white else 0
+    rook = WROOK * sign
+    short_right = WHITE_SHORT if white else BLACK_SHORT
+    long_right = WHITE_LONG if white else BLACK_LONG
+    if quiets and king_sq == row * 8 + 4:
+        base = row * 8
+        if (
+            board.castling & short_right
+            and not occupied & (0b01100000 << base)
+            and board.squares[base + 7] == rook
+            and not any(bb_attacked(board, base + c, not white) for c in (4, 5, 6))
+        ):
+            moves.append(king_sq | ((base + 6) << 6) | CASTLE)
+        if (
+            board.castling & long_right
+            and not occupied & (0b00001110 << base)
+            and board.squares[base] == rook
+            and not any(bb_attacked(board, base + c, not white) for c in (4, 3, 2))
+        ):
+            moves.append(king_sq | ((base + 2) << 6) | CASTLE)
+
+    return moves
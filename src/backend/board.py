@@ -1,27 +1,61 @@
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
+from .tables import MOVES
+from .zobrist import PIECE_KEYS, SIDE_KEY, compute_hash, state_key
 
-@dataclass
+
+@dataclass(slots=True)
 class MoveRecord:
+    # one is made for every move played, slots keep it small and quick to build
     moved_piece: int
     captured_piece: int
     promotion: Optional[int] = None
     from_sq: Tuple[int, int] = (0, 0)
     to_sq: Tuple[int, int] = (0, 0)
     en_passant: bool = False
+    # castling rights and en passant square from before the move
+    castling: int = 0
+    ep_square: Optional[Tuple[int, int]] = None
+    # game bookkeeping from before the move, filled in by Game
+    halfmove_clock: int = 0
+    result: Optional[str] = None
 
 
 EMPTY = 0
 WPAWN, WKNIGHT, WBISHOP, WROOK, WQUEEN, WKING = 1, 2, 3, 4, 5, 6
 BPAWN, BKNIGHT, BBISHOP, BROOK, BQUEEN, BKING = -1, -2, -3, -4, -5, -6
 
+# material by abs(piece), for ordering and exchanges. the king is worth more
+# than anything it could ever win
+PIECE_VALUES = [0, 100, 320, 330, 500, 900, 20000]
+
+# castling rights bits
+WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG = 1, 2, 4, 8
+ALL_CASTLING = 15
+
+# rights that survive a move touching square x * 8 + y, from or to
+CASTLING_KEEP = [ALL_CASTLING] * 64
+CASTLING_KEEP[0 * 8 + 0] = ALL_CASTLING & ~BLACK_LONG
+CASTLING_KEEP[0 * 8 + 4] = ALL_CASTLING & ~(BLACK_SHORT | BLACK_LONG)
+CASTLING_KEEP[0 * 8 + 7] = ALL_CASTLING & ~BLACK_SHORT
+CASTLING_KEEP[7 * 8 + 0] = ALL_CASTLING & ~WHITE_LONG
+CASTLING_KEEP[7 * 8 + 4] = ALL_CASTLING & ~(WHITE_SHORT | WHITE_LONG)
+CASTLING_KEEP[7 * 8 + 7] = ALL_CASTLING & ~WHITE_SHORT
+
 
 class Board:
     def __init__(self):
         self.board = self.starting_pos()
         self.wking_pos = (7, 4)
         self.bking_pos = (0, 4)
+        self.castling = ALL_CASTLING
+        # square a pawn can capture en passant onto, set after a double push
+        self.ep_square = None
+        # zobrist key of the position, kept up to date by apply_move/undo_move
+        self.hash = compute_hash(self.board, True, self.castling, self.ep_square)
+        # optional listener told about every move, e.g. an incremental eval
+        self.evaluator = None
 
     def starting_pos(self):
         return [
@@ -35,8 +69,28 @@ class Board:
             [WROOK, WKNIGHT, WBISHOP, WQUEEN, WKING, WBISHOP, WKNIGHT, WROOK],
         ]
 
+    def set_position(self, matrix, white_to_move=True, castling=0, ep_square=None):
+        # replaces the whole position, e.g. from a fen
+        self.board = matrix
+        for x in range(8):
+            for y in range(8):
+                if matrix[x][y] == WKING:
+                    self.wking_pos = (x, y)
+                elif matrix[x][y] == BKING:
+                    self.bking_pos = (x, y)
+        self.castling = castling
+        self.ep_square = ep_square
+        self.hash = compute_hash(matrix, white_to_move, castling, ep_square)
+        if self.evaluator is not None:
+            self.evaluator.refresh()
+
+    def piece_at(self, sq):
+        # piece on square x * 8 + y
+        return self.board[sq >> 3][sq & 7]
+
     def apply_move(self, move):
-        (fx, fy), (tx, ty) = move
+        from_sq, to_sq = move
+        (fx, fy), (tx, ty) = from_sq, to_sq
 
         original_piece = self.board[fx][fy]
 
@@ -55,8 +109,9 @@ class Board:
         # HANDLE EN PASSANT
         elif captured == EMPTY and abs(original_piece) == WPAWN:
             if fy != ty:
-                captured = self.board[tx + abs(original_piece)][ty]
-                self.board[tx + abs(original_piece)][ty] = EMPTY
+                # the captured pawn sits behind the target square
+                captured = self.board[tx + original_piece][ty]
+                self.board[tx + original_piece][ty] = EMPTY
                 en_passant = True
         # HANDLE CASTLING
         # CHECK IF KING MADE A 2SQR MOVE
@@ -80,14 +135,18 @@ class Board:
             promotion = BQUEEN
             self.board[tx][ty] = BQUEEN
 
-        return MoveRecord(
+        record = MoveRecord(
             moved_piece=original_piece,
             captured_piece=captured,
             promotion=promotion,
-            from_sq=(fx, fy),
-            to_sq=(tx, ty),
+            from_sq=from_sq,
+            to_sq=to_sq,
             en_passant=en_passant,
+            castling=self.castling,
+            ep_square=self.ep_square,
         )
+        self.update_state(record)
+        return record
 
     def undo_move(self, move, move_record):
         (fx, fy), (tx, ty) = move
@@ -116,5 +175,90 @@ class Board:
         # ENPASSANT UNDO
         elif move_record.en_passant:
             self.board[tx][ty] = EMPTY
-            rank = tx + abs(move_record.moved_piece)
+            rank = tx + move_record.moved_piece
             self.board[rank][ty] = move_record.captured_piece
+
+        self.revert_state(move_record)
+
+    def apply_packed(self, packed):
+        # search-side entry point for packed int moves, see moves.py
+        return self.apply_move(MOVES[packed & 0xFFF])
+
+    def undo_packed(self, packed, move_record):
+        self.undo_move(MOVES[packed & 0xFFF], move_record)
+
+    def apply_null(self):
+        # a pass: the other side moves next and any en passant chance is gone.
+        # returns the en passant square undo_null needs back
+        ep_square = self.ep_square
+        if ep_square is not None:
+            self.hash ^= state_key(self.castling, ep_square)
+            self.ep_square = None
+            self.hash ^= state_key(self.castling, None)
+        self.hash ^= SIDE_KEY
+        return ep_square
+
+    def undo_null(self, ep_square):
+        if ep_square is not None:
+            self.hash ^= state_key(self.castling, None)
+            self.ep_square = ep_square
+            self.hash ^= state_key(self.castling, ep_square)
+        self.hash ^= SIDE_KEY
+
+    def has_pieces(self, white):
+        # any knight, bishop, rook or queen of one side. with only king and
+        # pawns left zugzwang is common and passing is no sign of strength
+        lo, hi = (WKNIGHT, WQUEEN) if white else (BQUEEN, BKNIGHT)
+        return any(lo <= p <= hi for row in self.board for p in row)
+
+    def update_state(self, record):
+        # castling rights, en passant square and hash after a move was played
+        (fx, fy), (tx, ty) = record.from_sq, record.to_sq
+        old = state_key(self.castling, self.ep_square)
+
+        self.castling &= CASTLING_KEEP[fx * 8 + fy] & CASTLING_KEEP[tx * 8 + ty]
+        if abs(record.moved_piece) == WPAWN and abs(fx - tx) == 2:
+            self.ep_square = ((fx + tx) // 2, fy)
+        else:
+            self.ep_square = None
+
+        new = state_key(self.castling, self.ep_square)
+        self.hash ^= self.hash_delta(record) ^ old ^ new
+        if self.evaluator is not None:
+            self.evaluator.apply(record)
+
+    def revert_state(self, record):
+        old = state_key(self.castling, self.ep_square)
+        self.castling = record.castling
+        self.ep_square = record.ep_square
+        new = state_key(self.castling, self.ep_square)
+        self.hash ^= self.hash_delta(record) ^ old ^ new
+        if self.evaluator is not None:
+            self.evaluator.revert(record)
+
+    def hash_delta(self, record):
+        # xor of every key a move touches, so applying it twice is a no-op
+        (fx, fy), (tx, ty) = record.from_sq, record.to_sq
+        frm = fx * 8 + fy
+        to = tx * 8 + ty
+        piece = record.moved_piece
+        landed = piece if record.promotion is None else record.promotion
+
+        key = SIDE_KEY ^ PIECE_KEYS[piece + 6][frm] ^ PIECE_KEYS[landed + 6][to]
+
+        captured = record.captured_piece
+        if record.en_passant:
+            key ^= PIECE_KEYS[captured + 6][to + 8 * piece]
+        elif captured != EMPTY:
+            key ^= PIECE_KEYS[captured + 6][to]
+
+        # castling moves the rook too
+        if abs(piece) == WKING and abs(fy - ty) == 2:
+            rook = PIECE_KEYS[(WROOK if piece > 0 else BROOK) + 6]
+            row = fx * 8
+            if ty == 6:
+                key ^= rook[row + 7] ^ rook[row + 5]
+            else:
+                key ^= rook[row] ^ rook[row + 3]
+
+        return key
@@ -0,0 +1,157 @@
+from .board import Board
+from .board import EMPTY
+from .board import WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG
+from .board import WPAWN, BPAWN, WKING
+from .move_gen import isSquareAttacked
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+FEN_PIECES = {"p": 1, "n": 2, "b": 3, "r": 4, "q": 5, "k": 6}
+PIECE_CHARS = {code: c for c, code in FEN_PIECES.items()}
+
+CASTLING_CHARS = [
+    ("K", WHITE_SHORT),
+    ("Q", WHITE_LONG),
+    ("k", BLACK_SHORT),
+    ("q", BLACK_LONG),
+]
+
+
+def parse_placement(field):
+    rows = field.split("/")
+    if len(rows) != 8:
+        raise ValueError(f"invalid fen placement: {field!r}")
+    matrix = []
+    for text in rows:
+        row = []
+        for c in text:
+            if c.isdigit():
+                row.extend([EMPTY] * int(c))
+            elif c.lower() in FEN_PIECES:
+                piece = FEN_PIECES[c.lower()]
+                row.append(piece if c.isupper() else -piece)
+            else:
+                raise ValueError(f"invalid fen piece: {c!r}")
+        if len(row) != 8:
+            raise ValueError(f"invalid fen rank: {text!r}")
+        matrix.append(row)
+    return matrix
+
+
+def placement_fen(matrix):
+    rows = []
+    for row in matrix:
+        text = ""
+        empty = 0
+        for piece in row:
+            if piece == EMPTY:
+                empty += 1
+                continue
+            if empty:
+                text += str(empty)
+                empty = 0
+            c = PIECE_CHARS[abs(piece)]
+            text += c.upper() if piece > 0 else c
+        if empty:
+            text += str(empty)
+        rows.append(text)
+    return "/".join(rows)
+
+
+def _square(name):
+    if len(name) != 2 or name[0] not in "abcdefgh" or name[1] not in "12345678":
+        raise ValueError(f"invalid square: {name!r}")
+    return (8 - int(name[1]), "abcdefgh".index(name[0]))
+
+
+def _square_name(square):
+    x, y = square
+    return f"{'abcdefgh'[y]}{8 - x}"
+
+
+def check_position(matrix, turn, ep_square=None):
+    # one king a side, no pawns on the first or last rank, an en passant square
+    # right behind a pawn that just made a double push, and the side that just
+    # moved can't have left its king in check. anything else breaks move
+    # generation later on.
+    kings = {}
+    for x, row in enumerate(matrix):
+        for y, piece in enumerate(row):
+            if abs(piece) == WKING:
+                kings.setdefault(piece > 0, []).append((x, y))
+    for white, name in ((True, "white"), (False, "black")):
+        if len(kings.get(white, ())) != 1:
+            raise ValueError(f"invalid fen: {name} needs exactly one king")
+    if any(abs(piece) == WPAWN for piece in matrix[0] + matrix[7]):
+        raise ValueError("invalid fen: pawn on the first or last rank")
+    if ep_square is not None:
+        x, y = ep_square
+        # white to move takes on the sixth rank, black on the third
+        row, pawn = (2, BPAWN) if turn == "white" else (5, WPAWN)
+        behind = x + 1 if turn == "white" else x - 1
+        if x != row or matrix[x][y] != EMPTY or matrix[behind][y] != pawn:
+            name = _square_name(ep_square)
+            raise ValueError(f"invalid fen en passant square: {name}")
+    board = Board()
+    board.set_position(matrix, turn == "white")
+    waiting = turn != "white"
+    x, y = kings[waiting][0]
+    if isSquareAttacked(board, x, y, not waiting):
+        raise ValueError("invalid fen: the side not to move is in check")
+
+
+def parse_fen(fen):
+    # (matrix, turn, castling bits, ep square, halfmove clock, fullmove number).
+    # the last four fields may be missing, as in epd.
+    fields = fen.split()
+    if len(fields) < 2:
+        raise ValueError(f"invalid fen: {fen!r}")
+    matrix = parse_placement(fields[0])
+    if fields[1] not in ("w", "b"):
+        raise ValueError(f"invalid fen side to move: {fields[1]!r}")
+    turn = "white" if fields[1] == "w" else "black"
+
+    castling_field = fields[2] if len(fields) > 2 else "-"
+    castling = 0
+    for c, right in CASTLING_CHARS:
+        if c in castling_field:
+            castling |= right
+
+    ep_field = fields[3] if len(fields) > 3 else "-"
+    try:
+        ep_square = None if ep_field == "-" else _square(ep_field)
+        halfmove = int(fields[4]) if len(fields) > 4 else 0
+        fullmove = int(fields[5]) if len(fields) > 5 else 1
+    except (ValueError, IndexError):
+        raise ValueError(f"invalid fen: {fen!r}")
+    if halfmove < 0 or fullmove < 0:
+        raise ValueError(f"invalid fen move counters: {fen!r}")
+    check_position(matrix, turn, ep_square)
+    return matrix, turn, castling, ep_square, halfmove, fullmove
+
+
+def board_from_fen(fen, board_class=Board):
+    # a board set up from a fen, and the turn and clocks that come with it
+    matrix, turn, castling, ep_square, halfmove, fullmove = parse_fen(fen)
+    board = board_class()
+    board.set_position(matrix, turn == "white", castling, ep_square)
+    return board, turn, halfmove, fullmove
+
+
+def board_to_fen(board, turn="white", halfmove_clock=0, fullmove=1):
+    castling = "".join(c for c, right in CASTLING_CHARS if board.castling & right)
+    ep = "-" if board.ep_square is None else _square_name(board.ep_square)
+    side = "w" if turn == "white" else "b"
+    return (
+        f"{placement_fen(board.board)} {side} {castling or '-'} {ep} "
+        f"{halfmove_clock} {fullmove}"
+    )
+
+
+def game_from_fen(fen, board_class=Board):
+    # imported here, game.py itself imports this module
+    from .game import Game
+
+    game = Game(board_class)
+    game.load_fen(fen)
+    return game
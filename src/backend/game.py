@@ -1,35 +1,31 @@
 from .board import Board
 from .board import WPAWN, WKNIGHT, WBISHOP, WROOK, WQUEEN, WKING
 from .board import BPAWN, BKNIGHT, BBISHOP, BROOK, BQUEEN, BKING, EMPTY
-from dataclasses import dataclass
-from typing import List, Optional
-import copy
-
-from .move_gen import getLegalMoves, isSquareAttacked
+from .move_gen import getLegalMoves, getLegalMovesPacked, isSquareAttacked
 from .move_gen import canCastle
+from .fen import parse_fen, board_to_fen
 
 
-@dataclass
-class GameState:
-    board_state: List[List[int]]
-    wking_pos: tuple
-    bking_pos: tuple
-    turn: str
-    halfmove_clock: int
-    game_over: bool
-    result: Optional[str]
-
 class Game:
-    def __init__(self):
-        self.board = Board()
+    def __init__(self, board_class=Board):
+        self.board = board_class()
         self.turn = "white"
         self.game_over = False
         self.result = None
         self.halfmove_clock = 0
-        
-        self.state_stack = []
-        self.redo_stack = []
+        self.fullmove = 1
+
+        # committed moves as MoveRecords, they double as the undo stack
         self.history = []
+        # (record, result) of undone moves, newest last
+        self.redo_stack = []
+
+        # legal moves of the last position they were generated for, keyed by
+        # its hash. make_move validates and then decides the game state from
+        # the same list, and the caller asking for the choices gets it too.
+        self._moves_key = None
+        self._moves = []
+        self._move_set = frozenset()
 
     def is_check(self, color):
         king_pos = self.board.wking_pos if color == "white" else self.board.bking_pos
@@ -37,7 +33,7 @@ class Game:
 
 
     def get_gamestate(self):
-        moves = self.legal_moves()
+        moves = self._cached_moves()
 
         if self.halfmove_clock >= 100:
             return "draw_fifty_move_rule"
@@ -51,79 +47,109 @@ class Game:
         else:
             return "stalemate"
 
-    def legal_moves(self):
-        return getLegalMoves(self.board, self.turn, self.history)
-    
-    def save_state(self):
-        state = GameState(
-            board_state=copy.deepcopy(self.board.board),
-            wking_pos=self.board.wking_pos,
-            bking_pos=self.board.bking_pos,
-            turn=self.turn,
-            halfmove_clock=self.halfmove_clock,
-            game_over=self.game_over,
-            result=self.result
-        )
-        return state
-    
-    def restore_state(self, state):
-        self.board.board = copy.deepcopy(state.board_state)
-        self.board.wking_pos = state.wking_pos
-        self.board.bking_pos = state.bking_pos
-        self.turn = state.turn
-        self.halfmove_clock = state.halfmove_clock
-        self.game_over = state.game_over
-        self.result = state.result
+    def _cached_moves(self):
+        # the hash covers side to move, castling rights and the ep square, the
+        # clocks don't change which moves are legal
+        key = self.board.hash
+        if key != self._moves_key:
+            self._moves = getLegalMoves(self.board, self.turn)
+            self._move_set = frozenset(self._moves)
+            self._moves_key = key
+        return self._moves
 
-    def make_move(self, move):
-        if move not in self.legal_moves():
-            print("> illegal move\n")
-            return None
+    def invalidate_moves(self):
+        # for code that edits self.board without going through its moves
+        self._moves_key = None
 
-        current_state = self.save_state()
-        self.state_stack.append(current_state)
-        self.redo_stack.clear()
+    def legal_moves(self):
+        # a copy, callers are free to sort or trim it
+        return list(self._cached_moves())
+
+    def is_legal(self, move):
+        self._cached_moves()
+        return move in self._move_set
 
+    def legal_moves_packed(self):
+        return getLegalMovesPacked(self.board, self.turn)
+    
+    def _play(self, move):
+        # play a move and do the bookkeeping, the record keeps what undo needs
         record = self.board.apply_move(move)
+        record.halfmove_clock = self.halfmove_clock
+        record.result = self.result
         self.history.append(record)
 
         if record.moved_piece in [WPAWN, BPAWN] or record.captured_piece != EMPTY:
             self.halfmove_clock = 0
         else:
             self.halfmove_clock += 1
+        if self.turn == "black":
+            self.fullmove += 1
+
+        self.turn = "black" if self.turn == "white" else "white"
+        return record
 
+    def make_move(self, move):
+        if not self.is_legal(move):
+            print("> illegal move\n")
+            return None
+
+        self.redo_stack.clear()
+        record = self._play(move)
+
+        # the side now to move decides whether the game goes on
         state = self.get_gamestate()
         if state != "ongoing":
             self.game_over = True
             self.result = state
-        else:
-            self.turn = "black" if self.turn == "white" else "white"
 
         return record
 
     def undo(self):
-        if not self.state_stack:
+        if not self.history:
             return False
-        current_state = self.save_state()
-        self.redo_stack.append(current_state)
-        previous_state = self.state_stack.pop()
-        self.restore_state(previous_state)
-        if self.history:
-            self.history.pop()
+        record = self.history.pop()
+        self.redo_stack.append((record, self.result))
+
+        self.board.undo_move((record.from_sq, record.to_sq), record)
+        self.halfmove_clock = record.halfmove_clock
+        self.result = record.result
+        self.game_over = record.result is not None
+        self.turn = "black" if self.turn == "white" else "white"
+        if self.turn == "black":
+            self.fullmove -= 1
         return True
-    
+
     def redo(self):
         if not self.redo_stack:
             return False
-        current_state = self.save_state()
-        self.state_stack.append(current_state)
-        next_state = self.redo_stack.pop()
-        self.restore_state(next_state)
+        record, result = self.redo_stack.pop()
+        self._play((record.from_sq, record.to_sq))
+        self.result = result
+        self.game_over = result is not None
         return True
-    
+
+    def load_fen(self, fen):
+        # starts over from the fen position, raises ValueError on a bad one
+        matrix, turn, castling, ep_square, halfmove, fullmove = parse_fen(fen)
+        self.board.set_position(matrix, turn == "white", castling, ep_square)
+        self.turn = turn
+        self.halfmove_clock = halfmove
+        self.fullmove = fullmove
+        self.history = []
+        self.redo_stack = []
+        self.invalidate_moves()
+
+        state = self.get_gamestate()
+        self.game_over = state != "ongoing"
+        self.result = state if self.game_over else None
+
+    def to_fen(self):
+        return board_to_fen(self.board, self.turn, self.halfmove_clock, self.fullmove)
+
     def can_undo(self):
-        return len(self.state_stack) > 0
-    
+        return len(self.history) > 0
+
     def can_redo(self):
         return len(self.redo_stack) > 0
     
@@ -2,103 +2,187 @@ from .pieces import getPseudoLegalMoves, in_bounds
 from .board import WPAWN, WKNIGHT, WBISHOP, WROOK, WQUEEN, WKING
 from .board import EMPTY
 from .board import BPAWN, BKNIGHT, BBISHOP, BROOK, BQUEEN, BKING
+from .board import WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG
+from .bitboard import BitboardBoard, bb_legal_moves, bb_square_attacked
+from .bitboard import bb_legal_moves_packed
+from .moves import pack_with_flags
+from .tables import KNIGHT_TARGETS, KING_TARGETS, WPAWN_TARGETS, BPAWN_TARGETS
+from .tables import BISHOP_RAYS, ROOK_RAYS
 
 
 def isSquareAttacked(board, x, y, by_white):
-    # pawns
-    direction = 1 if by_white else -1
-    for dy in [-1, 1]:
-        nx, ny = x + direction, y + dy
-        if in_bounds(nx, ny) and board.board[nx][ny] == (WPAWN if by_white else BPAWN):
+    if isinstance(board, BitboardBoard):
+        return bb_square_attacked(board, x, y, by_white)
+
+    b = board.board
+
+    # pawns, looked up from the square with the other colour's attack pattern
+    pawn = WPAWN if by_white else BPAWN
+    for nx, ny in (BPAWN_TARGETS if by_white else WPAWN_TARGETS)[x][y]:
+        if b[nx][ny] == pawn:
             return True
 
     # knights
-    for dx, dy in [
-        (2, 1),
-        (1, 2),
-        (-1, 2),
-        (-2, 1),
-        (-2, -1),
-        (-1, -2),
-        (1, -2),
-        (2, -1),
-    ]:
-        nx, ny = x + dx, y + dy
-        if in_bounds(nx, ny) and board.board[nx][ny] == (
-            WKNIGHT if by_white else BKNIGHT
-        ):
+    knight = WKNIGHT if by_white else BKNIGHT
+    for nx, ny in KNIGHT_TARGETS[x][y]:
+        if b[nx][ny] == knight:
             return True
 
     # bishops queens
-    for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-        nx, ny = x + dx, y + dy
-        while in_bounds(nx, ny):
-            p = board.board[nx][ny]
+    bishop = WBISHOP if by_white else BBISHOP
+    queen = WQUEEN if by_white else BQUEEN
+    for ray in BISHOP_RAYS[x][y]:
+        for nx, ny in ray:
+            p = b[nx][ny]
             if p != EMPTY:
-                if p == (WBISHOP if by_white else BBISHOP) or p == (
-                    WQUEEN if by_white else BQUEEN
-                ):
+                if p == bishop or p == queen:
                     return True
                 break
-            nx += dx
-            ny += dy
 
     # rooks queens
-    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nx, ny = x + dx, y + dy
-        while in_bounds(nx, ny):
-            p = board.board[nx][ny]
+    rook = WROOK if by_white else BROOK
+    for ray in ROOK_RAYS[x][y]:
+        for nx, ny in ray:
+            p = b[nx][ny]
             if p != EMPTY:
-                if p == (WROOK if by_white else BROOK) or p == (
-                    WQUEEN if by_white else BQUEEN
-                ):
+                if p == rook or p == queen:
                     return True
                 break
-            nx += dx
-            ny += dy
 
     # king
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            if dx == 0 and dy == 0:
-                continue
-            nx, ny = x + dx, y + dy
-            if in_bounds(nx, ny) and board.board[nx][ny] == (
-                WKING if by_white else BKING
-            ):
-                return True
+    king = WKING if by_white else BKING
+    for nx, ny in KING_TARGETS[x][y]:
+        if b[nx][ny] == king:
+            return True
 
     return False
 
 
-def getEnPassantMoves(board, color, history):
-    if not history:
+def getSmallestAttacker(squares, x, y, by_white):
+    # square of the least valuable piece of one side attacking (x, y) in
+    # `squares`, 64 pieces indexed x * 8 + y, None if there is none. the same
+    # lookups as isSquareAttacked, in value order, for exchanges played out on
+    # a scratch copy of the board where pieces come off one by one
+    pawn = WPAWN if by_white else BPAWN
+    for nx, ny in (BPAWN_TARGETS if by_white else WPAWN_TARGETS)[x][y]:
+        if squares[nx * 8 + ny] == pawn:
+            return nx, ny
+
+    knight = WKNIGHT if by_white else BKNIGHT
+    for nx, ny in KNIGHT_TARGETS[x][y]:
+        if squares[nx * 8 + ny] == knight:
+            return nx, ny
+
+    # a queen on a ray is only kept for after the rooks
+    queen = WQUEEN if by_white else BQUEEN
+    queen_square = None
+    bishop = WBISHOP if by_white else BBISHOP
+    for ray in BISHOP_RAYS[x][y]:
+        for nx, ny in ray:
+            p = squares[nx * 8 + ny]
+            if p != EMPTY:
+                if p == bishop:
+                    return nx, ny
+                if p == queen:
+                    queen_square = nx, ny
+                break
+
+    rook = WROOK if by_white else BROOK
+    for ray in ROOK_RAYS[x][y]:
+        for nx, ny in ray:
+            p = squares[nx * 8 + ny]
+            if p != EMPTY:
+                if p == rook:
+                    return nx, ny
+                if p == queen:
+                    queen_square = nx, ny
+                break
+
+    if queen_square is not None:
+        return queen_square
+
+    king = WKING if by_white else BKING
+    for nx, ny in KING_TARGETS[x][y]:
+        if squares[nx * 8 + ny] == king:
+            return nx, ny
+
+    return None
+
+
+def getCheckersAndPins(board, color):
+    # looks out from the king once and returns
+    #   checkers: number of pieces giving check
+    #   evasions: squares a non-king move must land on to answer a single
+    #             check (capture the checker or block), None if not in check
+    #   pins: {square of a pinned piece: squares it may still move to}
+    b = board.board
+    sign = 1 if color == "white" else -1
+    kx, ky = board.wking_pos if color == "white" else board.bking_pos
+    enemy_queen = -WQUEEN * sign
+
+    checkers = 0
+    evasions = None
+    pins = {}
+
+    for rays, slider in [
+        (BISHOP_RAYS[kx][ky], -WBISHOP * sign),
+        (ROOK_RAYS[kx][ky], -WROOK * sign),
+    ]:
+        for ray in rays:
+            blocker = None
+            for i, (nx, ny) in enumerate(ray):
+                p = b[nx][ny]
+                if p == EMPTY:
+                    continue
+                if p * sign > 0:
+                    # first own piece might be pinned, a second one shields it
+                    if blocker is not None:
+                        break
+                    blocker = (nx, ny)
+                else:
+                    if p == slider or p == enemy_queen:
+                        if blocker is None:
+                            checkers += 1
+                            evasions = set(ray[: i + 1])
+                        else:
+                            pins[blocker] = set(ray[: i + 1])
+                    break
+
+    enemy_knight = -WKNIGHT * sign
+    for nx, ny in KNIGHT_TARGETS[kx][ky]:
+        if b[nx][ny] == enemy_knight:
+            checkers += 1
+            evasions = {(nx, ny)}
+
+    enemy_pawn = -WPAWN * sign
+    for nx, ny in (WPAWN_TARGETS if sign > 0 else BPAWN_TARGETS)[kx][ky]:
+        if b[nx][ny] == enemy_pawn:
+            checkers += 1
+            evasions = {(nx, ny)}
+
+    return checkers, evasions, pins
+
+
+def getEnPassantMoves(board, color):
+    if board.ep_square is None:
         return []
 
-    row = 3 if color == "white" else 4
-    endingRow = row - 1 if color == "white" else row + 1
-    enemyPawnStart = 1 if color == "white" else 6
+    endingRow, col = board.ep_square
+    row = endingRow + 1 if color == "white" else endingRow - 1
     enemyPawn = BPAWN if color == "white" else WPAWN
     pawn = WPAWN if color == "white" else BPAWN
     moves = []
 
-    # check last move was double pawn move
-    lastMove = history[-1]
-    if (
-        lastMove.moved_piece == enemyPawn
-        and lastMove.to_sq[0] == row
-        and lastMove.from_sq[0] == enemyPawnStart
-        and board[endingRow][lastMove.to_sq[1]] == EMPTY
-    ):
+    # the pawn that just made the double move has to still be there
+    if board.board[row][col] == enemyPawn:
         # Get adjacent player pawns
-        cols = (lastMove.to_sq[1] - 1, lastMove.to_sq[1] + 1)
-        for col in cols:
-            if in_bounds(row, col) and board[row][col] == pawn:
-                moves.append(((row, col), (endingRow, lastMove.to_sq[1])))
+        for adjacent in (col - 1, col + 1):
+            if in_bounds(row, adjacent) and board.board[row][adjacent] == pawn:
+                moves.append(((row, adjacent), (endingRow, col)))
     return moves
 
 
-def canCastle(board, color, side, history):
+def canCastle(board, color, side):
     row = 7 if color == "white" else 0
     king = WKING if color == "white" else BKING
     castle_rook = WROOK if color == "white" else BROOK
@@ -106,8 +190,11 @@ def canCastle(board, color, side, history):
 
     #  (SHORT)
     if side == "SHORT":
+        # rights are lost for good once the king or the rook moves
+        if not board.castling & (WHITE_SHORT if color == "white" else BLACK_SHORT):
+            return False
         # LOS CHECK AND Verigying if King and rook are at home positions
-        if (
+        return (
             board.board[row][5] == 0
             and board.board[row][6] == 0
             and board.board[row][7] == castle_rook
@@ -116,20 +203,14 @@ def canCastle(board, color, side, history):
                 not isSquareAttacked(board, row, col, by_white=by_white)
                 for col in [4, 5, 6]
             )
-        ):
-            # History check if any of them has moved in the past
-            for move in history:
-                if move.moved_piece == king:
-                    return False
-                elif move.moved_piece == castle_rook and move.from_sq == (row, 7):
-                    return False
-            return True
-        return False
+        )
 
     #  (LONG)
     elif side == "LONG":
+        if not board.castling & (WHITE_LONG if color == "white" else BLACK_LONG):
+            return False
         # LOS CHECK AND Verigying if King and rook are at home positions
-        if (
+        return (
             board.board[row][1] == 0
             and board.board[row][2] == 0
             and board.board[row][3] == 0
@@ -139,21 +220,19 @@ def canCastle(board, color, side, history):
                 not isSquareAttacked(board, row, col, by_white=by_white)
                 for col in [4, 3, 2]
             )
-        ):
-            # History check if any of them has moved in the past
-            for move in history:
-                if move.moved_piece == king:
-                    return False
-                elif move.moved_piece == castle_rook and move.from_sq == (row, 0):
-                    return False
-            return True
-        return False
+        )
 
     return False
 
 
-def getLegalMoves(board, color, history):
+def getLegalMoves(board, color, captures=True, quiets=True):
+    # captures / quiets pick which half of the moves to generate, en passant
+    # counts as a capture and castling as a quiet move
+    if isinstance(board, BitboardBoard):
+        return bb_legal_moves(board, color, captures, quiets)
+
     moves = []
+    checkers, evasions, pins = getCheckersAndPins(board, color)
 
     for x in range(8):
         for y in range(8):
@@ -165,20 +244,41 @@ def getLegalMoves(board, color, history):
             if color == "black" and piece > 0:
                 continue
 
-            for nx, ny in getPseudoLegalMoves(board.board, x, y):
-                move = ((x, y), (nx, ny))
+            # KING MOVES, the attack test still decides these
+            if abs(piece) == WKING:
+                for nx, ny in getPseudoLegalMoves(board.board, x, y):
+                    if not (captures if board.board[nx][ny] else quiets):
+                        continue
+                    move = ((x, y), (nx, ny))
 
-                record = board.apply_move(move)
+                    record = board.apply_move(move)
 
-                king_pos = board.wking_pos if color == "white" else board.bking_pos
-                if not isSquareAttacked(board, *king_pos, by_white=(color == "black")):
-                    moves.append(move)
+                    king_pos = board.wking_pos if color == "white" else board.bking_pos
+                    if not isSquareAttacked(
+                        board, *king_pos, by_white=(color == "black")
+                    ):
+                        moves.append(move)
 
-                board.undo_move(move, record)
+                    board.undo_move(move, record)
+                continue
+
+            # in double check only the king can move
+            if checkers > 1:
+                continue
+
+            pin_line = pins.get((x, y))
+            for target in getPseudoLegalMoves(board.board, x, y):
+                if not (captures if board.board[target[0]][target[1]] else quiets):
+                    continue
+                if evasions is not None and target not in evasions:
+                    continue
+                if pin_line is not None and target not in pin_line:
+                    continue
+                moves.append(((x, y), target))
 
     # EN PASSANT LOGIC
 
-    for move in getEnPassantMoves(board.board, color, history):
+    for move in getEnPassantMoves(board, color) if captures else []:
         record = board.apply_move(move)
 
         king_pos = board.wking_pos if color == "white" else board.bking_pos
@@ -193,15 +293,26 @@ def getLegalMoves(board, color, history):
     king_start = (row, 4)
 
     # (SHORT) castling
-    if canCastle(board, color, "SHORT", history):
+    if quiets and canCastle(board, color, "SHORT"):
         rook_start = (row, 7)
         # King moves
         moves.append((king_start, (row, 6)))
 
     # (LONG) castling
-    if canCastle(board, color, "LONG", history):
+    if quiets and canCastle(board, color, "LONG"):
         rook_start = (row, 0)
         # King moves
         moves.append((king_start, (row, 2)))
 
     return moves
+
+
+def getLegalMovesPacked(board, color, captures=True, quiets=True):
+    # same moves as getLegalMoves, as ints with flags (see moves.py)
+    if isinstance(board, BitboardBoard):
+        return bb_legal_moves_packed(board, color, captures, quiets)
+    b = board.board
+    return [
+        pack_with_flags(b, move)
+        for move in getLegalMoves(board, color, captures, quiets)
+    ]
@@ -0,0 +1,78 @@
+from .board import WPAWN, WKING, EMPTY
+from .tables import SQUARES, MOVES
+
+# packed moves are plain ints:
+#   bits 0-5    from square (x * 8 + y)
+#   bits 6-11   to square
+#   bits 12-16  flags
+# an int costs one small object where ((fx, fy), (tx, ty)) costs three tuples,
+# and fits straight into tt entries, killer slots and history tables.
+
+CAPTURE = 1 << 12
+EN_PASSANT = 1 << 13
+CASTLE = 1 << 14
+PROMOTION = 1 << 15
+DOUBLE_PUSH = 1 << 16
+
+SQUARE_MASK = 0xFFF
+
+
+def pack(move, flags=0):
+    (fx, fy), (tx, ty) = move
+    return (fx * 8 + fy) | ((tx * 8 + ty) << 6) | flags
+
+
+def unpack(packed):
+    # shared tuple from the table, nothing is allocated
+    return MOVES[packed & SQUARE_MASK]
+
+
+def from_square(packed):
+    return SQUARES[packed & 63]
+
+
+def to_square(packed):
+    return SQUARES[(packed >> 6) & 63]
+
+
+def move_flags(board, move):
+    # flags of a tuple move on the board it is about to be played on
+    (fx, fy), (tx, ty) = move
+    piece = board[fx][fy]
+    flags = 0
+    if board[tx][ty] != EMPTY:
+        flags |= CAPTURE
+    if abs(piece) == WPAWN:
+        if fy != ty and board[tx][ty] == EMPTY:
+            flags |= CAPTURE | EN_PASSANT
+        if tx == 0 or tx == 7:
+            flags |= PROMOTION
+        if abs(fx - tx) == 2:
+            flags |= DOUBLE_PUSH
+    elif abs(piece) == WKING and abs(fy - ty) == 2:
+        flags |= CASTLE
+    return flags
+
+
+def pack_with_flags(board, move):
+    return pack(move, move_flags(board, move))
+
+
+def with_flags(board, packed):
+    # flags for a squares-only packed move (a tt move, say), read off the board
+    # it is about to be played on
+    frm = packed & 63
+    to = (packed >> 6) & 63
+    piece = board.piece_at(frm)
+    target = board.piece_at(to)
+    flags = CAPTURE if target != EMPTY else 0
+    if piece == WPAWN or piece == -WPAWN:
+        if (frm ^ to) & 7 and target == EMPTY:
+            flags |= CAPTURE | EN_PASSANT
+        if to >> 3 == 0 or to >> 3 == 7:
+            flags |= PROMOTION
+        if abs(frm - to) == 16:
+            flags |= DOUBLE_PUSH
+    elif (piece == WKING or piece == -WKING) and abs((frm & 7) - (to & 7)) == 2:
+        flags |= CASTLE
+    return (packed & SQUARE_MASK) | flags
@@ -1,5 +1,7 @@
 from .board import WPAWN, WKNIGHT, WBISHOP, WROOK, WQUEEN, WKING
 from .board import EMPTY
+from .tables import KNIGHT_TARGETS, KING_TARGETS, WPAWN_TARGETS, BPAWN_TARGETS
+from .tables import BISHOP_RAYS, ROOK_RAYS
 
 # from .board import BPAWN, BKNIGHT, BBISHOP, BROOK, BQUEEN, BKING
 
@@ -14,18 +16,16 @@ def pawn_moves(board, x, y, piece):
 
     nx, ny = x + direction, y
 
-    if in_bounds(nx, ny) and board[nx][ny] == EMPTY:
+    if 0 <= nx < 8 and board[nx][ny] == EMPTY:
         moves.append((nx, ny))
 
         if (piece > 0 and x == 6) or (piece < 0 and x == 1):
             nx2 = nx + direction
-            if in_bounds(nx2, ny) and board[nx2][ny] == EMPTY:
+            if board[nx2][ny] == EMPTY:
                 moves.append((nx2, ny))
 
-    for dy in [-1, 1]:
-        nx, ny = x + direction, y + dy
-
-        if in_bounds(nx, ny) and board[nx][ny] != EMPTY and board[nx][ny] * piece < 0:
+    for nx, ny in (WPAWN_TARGETS if piece > 0 else BPAWN_TARGETS)[x][y]:
+        if board[nx][ny] * piece < 0:
             moves.append((nx, ny))
 
     return moves
@@ -33,47 +33,35 @@ def pawn_moves(board, x, y, piece):
 
 def knight_moves(board, x, y, piece):
     moves = []
-    # direction = -1 if piece > 0 else 1
-    jumps = [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]
-
-    # nx, ny = x + direction, y
-    # if in_bounds(nx, ny) and board[nx][ny] == EMPTY:
-    # moves.append((nx, ny))
 
-    for dx, dy in jumps:
-        nx, ny = x + dx, y + dy
-
-        if in_bounds(nx, ny) and (board[nx][ny] == EMPTY or board[nx][ny] * piece < 0):
+    for nx, ny in KNIGHT_TARGETS[x][y]:
+        target = board[nx][ny]
+        if target == EMPTY or target * piece < 0:
             moves.append((nx, ny))
 
     return moves
 
 
-def sliding_moves(board, x, y, piece, directions):
+def sliding_moves(board, x, y, piece, rays):
     moves = []
-    for dx, dy in directions:
-        nx, ny = x + dx, y + dy
-        while in_bounds(nx, ny):
-            if board[nx][ny] == EMPTY:
-                moves.append((nx, ny))
-            elif board[nx][ny] * piece < 0:
+    for ray in rays:
+        for nx, ny in ray:
+            target = board[nx][ny]
+            if target == EMPTY:
                 moves.append((nx, ny))
-                break
             else:
+                if target * piece < 0:
+                    moves.append((nx, ny))
                 break
-            nx += dx
-            ny += dy
     return moves
 
 
 def bishop_moves(board, x, y, piece):
-    directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-    return sliding_moves(board, x, y, piece, directions)
+    return sliding_moves(board, x, y, piece, BISHOP_RAYS[x][y])
 
 
 def rook_moves(board, x, y, piece):
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    return sliding_moves(board, x, y, piece, directions)
+    return sliding_moves(board, x, y, piece, ROOK_RAYS[x][y])
 
 
 def queen_moves(board, x, y, piece):
@@ -83,15 +71,10 @@ def queen_moves(board, x, y, piece):
 def king_moves(board, x, y, piece):
     moves = []
 
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            if dx == 0 and dy == 0:
-                continue
-            nx, ny = x + dx, y + dy
-            if in_bounds(nx, ny) and (
-                board[nx][ny] == EMPTY or board[nx][ny] * piece < 0
-            ):
-                moves.append((nx, ny))
+    for nx, ny in KING_TARGETS[x][y]:
+        target = board[nx][ny]
+        if target == EMPTY or target * piece < 0:
+            moves.append((nx, ny))
     return moves
 
 
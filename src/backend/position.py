@@ -0,0 +1,76 @@
+from .board import WPAWN, BPAWN, EMPTY
+from .move_gen import getLegalMoves, getLegalMovesPacked, isSquareAttacked
+from .tables import MOVES
+
+
+class Position:
+    # the game position as a search sees it. push / pop play and take back
+    # moves on the game's board while keeping the side to move, the fifty move
+    # clock and (through the board) castling rights, en passant square and hash
+    # in step. nothing here touches the committed game: history, redo stack and
+    # result stay as they were, as long as every push is popped again.
+
+    def __init__(self, board, turn="white", halfmove_clock=0):
+        self.board = board
+        self.turn = turn
+        self.halfmove_clock = halfmove_clock
+        # (move, record) for every pushed move, newest last
+        self.stack = []
+
+    @property
+    def hash(self):
+        return self.board.hash
+
+    @property
+    def ply(self):
+        return len(self.stack)
+
+    def push(self, move):
+        record = self.board.apply_move(move)
+        record.halfmove_clock = self.halfmove_clock
+        self.stack.append((move, record))
+
+        if record.moved_piece in (WPAWN, BPAWN) or record.captured_piece != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        self.turn = "black" if self.turn == "white" else "white"
+        return record
+
+    def push_packed(self, packed):
+        return self.push(MOVES[packed & 0xFFF])
+
+    def push_null(self):
+        # pass the turn without moving, for null move pruning. never legal in a
+        # game and not to be pushed while in check
+        ep_square = self.board.apply_null()
+        self.stack.append((None, (ep_square, self.halfmove_clock)))
+        self.halfmove_clock += 1
+        self.turn = "black" if self.turn == "white" else "white"
+
+    def pop(self):
+        move, record = self.stack.pop()
+        if move is None:
+            ep_square, self.halfmove_clock = record
+            self.board.undo_null(ep_square)
+            self.turn = "black" if self.turn == "white" else "white"
+            return None
+        self.board.undo_move(move, record)
+        self.halfmove_clock = record.halfmove_clock
+        self.turn = "black" if self.turn == "white" else "white"
+        return move
+
+    def legal_moves(self):
+        return getLegalMoves(self.board, self.turn)
+
+    def legal_moves_packed(self):
+        return getLegalMovesPacked(self.board, self.turn)
+
+    def in_check(self):
+        if self.turn == "white":
+            return isSquareAttacked(self.board, *self.board.wking_pos, by_white=False)
+        return isSquareAttacked(self.board, *self.board.bking_pos, by_white=True)
+
+    def is_terminal(self):
+        # mate, stalemate or the fifty move rule
+        return self.halfmove_clock >= 100 or not self.legal_moves()
@@ -0,0 +1,91 @@
+import re
+
+from .board import WPAWN, WKING, EMPTY
+from .move_gen import getLegalMoves, isSquareAttacked
+
+PIECE_LETTERS = {2: "N", 3: "B", 4: "R", 5: "Q", 6: "K"}
+PIECES_BY_LETTER = {letter: piece for piece, letter in PIECE_LETTERS.items()}
+
+# piece, from file, from rank, target square, promotion
+SAN_PATTERN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(=?[QRBN])?$")
+
+
+def square_name(x, y):
+    return f"{'abcdefgh'[y]}{8 - x}"
+
+
+def move_to_san(board, color, move, legal=None):
+    # standard algebraic notation of a legal move of `color`, for pgn.
+    # `legal` saves generating the moves again when the caller has them.
+    if legal is None:
+        legal = getLegalMoves(board, color)
+    (fx, fy), (tx, ty) = move
+    b = board.board
+    piece = abs(b[fx][fy])
+    capture = b[tx][ty] != EMPTY or (piece == WPAWN and fy != ty)
+
+    if piece == WKING and abs(fy - ty) == 2:
+        san = "O-O" if ty == 6 else "O-O-O"
+    elif piece == WPAWN:
+        san = ("abcdefgh"[fy] + "x" if capture else "") + square_name(tx, ty)
+        if tx in (0, 7):
+            san += "=Q"
+    else:
+        san = PIECE_LETTERS[piece]
+        # other pieces of the same kind that could go to the same square
+        others = [
+            frm
+            for frm, to in legal
+            if to == (tx, ty) and frm != (fx, fy) and abs(b[frm[0]][frm[1]]) == piece
+        ]
+        if others:
+            if all(y != fy for _, y in others):
+                san += "abcdefgh"[fy]
+            elif all(x != fx for x, _ in others):
+                san += str(8 - fx)
+            else:
+                san += square_name(fx, fy)
+        san += ("x" if capture else "") + square_name(tx, ty)
+
+    record = board.apply_move(move)
+    other = "black" if color == "white" else "white"
+    king_pos = board.bking_pos if color == "white" else board.wking_pos
+    if isSquareAttacked(board, *king_pos, by_white=(color == "white")):
+        san += "+" if getLegalMoves(board, other) else "#"
+    board.undo_move(move, record)
+    return san
+
+
+
+def san_to_move(board, color, text):
+    # the legal move written as `text` in san, None if there is none or it is
+    # ambiguous. extra disambiguation and check marks are fine, promotions
+    # to anything but a queen are not, this project never makes those.
+    text = text.rstrip("+#!?").replace("0", "O")
+    legal = getLegalMoves(board, color)
+    b = board.board
+    if text in ("O-O", "O-O-O"):
+        ty = 6 if text == "O-O" else 2
+        for (fx, fy), (tx, y) in legal:
+            if abs(b[fx][fy]) == WKING and fy == 4 and y == ty:
+                return ((fx, fy), (tx, y))
+        return None
+
+    match = SAN_PATTERN.match(text)
+    if match is None:
+        return None
+    letter, from_file, from_rank, target, promotion = match.groups()
+    if promotion and promotion[-1] != "Q":
+        return None
+    piece = PIECES_BY_LETTER[letter] if letter else WPAWN
+    to = (8 - int(target[1]), "abcdefgh".index(target[0]))
+
+    found = [
+        (frm, dest)
+        for frm, dest in legal
+        if dest == to
+        and abs(b[frm[0]][frm[1]]) == piece
+        and (from_file is None or frm[1] == "abcdefgh".index(from_file))
+        and (from_rank is None or frm[0] == 8 - int(from_rank))
+    ]
+    return found[0] if len(found) == 1 else None
@@ -0,0 +1,89 @@
+# lookup tables built once at import so the move generators and the attack
+# test never have to bounds check or build offset lists. every table is
+# indexed [x][y] and holds lists of (x, y) target squares that are on the board.
+
+
+def _in_bounds(x, y):
+    return 0 <= x < 8 and 0 <= y < 8
+
+
+def _targets(offsets):
+    return [
+        [
+            [(x + dx, y + dy) for dx, dy in offsets if _in_bounds(x + dx, y + dy)]
+            for y in range(8)
+        ]
+        for x in range(8)
+    ]
+
+
+def ray_squares(x, y, dx, dy):
+    squares = []
+    nx, ny = x + dx, y + dy
+    while _in_bounds(nx, ny):
+        squares.append((nx, ny))
+        nx += dx
+        ny += dy
+    return squares
+
+
+def _rays(directions):
+    # one list per direction, nearest square first. empty rays are dropped.
+    table = []
+    for x in range(8):
+        row = []
+        for y in range(8):
+            rays = [ray_squares(x, y, dx, dy) for dx, dy in directions]
+            row.append([ray for ray in rays if ray])
+        table.append(row)
+    return table
+
+
+KNIGHT_OFFSETS = [
+    (2, 1),
+    (1, 2),
+    (-1, 2),
+    (-2, 1),
+    (-2, -1),
+    (-1, -2),
+    (1, -2),
+    (2, -1),
+]
+KING_OFFSETS = [
+    (-1, -1),
+    (-1, 0),
+    (-1, 1),
+    (0, -1),
+    (0, 1),
+    (1, -1),
+    (1, 0),
+    (1, 1),
+]
+BISHOP_DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+ROOK_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+KNIGHT_TARGETS = _targets(KNIGHT_OFFSETS)
+KING_TARGETS = _targets(KING_OFFSETS)
+
+# squares attacked BY a pawn of that colour standing on [x][y]
+WPAWN_TARGETS = _targets([(-1, -1), (-1, 1)])
+BPAWN_TARGETS = _targets([(1, -1), (1, 1)])
+
+BISHOP_RAYS = _rays(BISHOP_DIRECTIONS)
+ROOK_RAYS = _rays(ROOK_DIRECTIONS)
+QUEEN_RAYS = [
+    [BISHOP_RAYS[x][y] + ROOK_RAYS[x][y] for y in range(8)] for x in range(8)
+]
+
+
+# SQUARES[x * 8 + y] -> (x, y) and MOVES[from | to << 6] -> ((fx, fy), (tx, ty)),
+# shared tuples handed out when decoding packed moves
+SQUARES = [(sq >> 3, sq & 7) for sq in range(64)]
+MOVES = [(SQUARES[i & 63], SQUARES[i >> 6]) for i in range(4096)]
+
+
+def to_mask(squares):
+    mask = 0
+    for x, y in squares:
+        mask |= 1 << (x * 8 + y)
+    return mask
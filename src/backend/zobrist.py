@@ -0,0 +1,42 @@
+import random
+
+# fixed seed so the same position gets the same key in every process and run
+_rng = random.Random(0x70C4)
+
+# PIECE_KEYS[piece + 6][x * 8 + y], the row for an empty square is all zeros
+PIECE_KEYS = [
+    [0 if piece == 0 else _rng.getrandbits(64) for _ in range(64)]
+    for piece in range(-6, 7)
+]
+SIDE_KEY = _rng.getrandbits(64)
+
+# one key per castling right, CASTLING_KEYS[rights] is the xor of the set ones
+_RIGHT_KEYS = [_rng.getrandbits(64) for _ in range(4)]
+CASTLING_KEYS = []
+for _rights in range(16):
+    _key = 0
+    for _bit in range(4):
+        if _rights & (1 << _bit):
+            _key ^= _RIGHT_KEYS[_bit]
+    CASTLING_KEYS.append(_key)
+
+# en passant target square, by file
+EP_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+
+
+def state_key(castling, ep_square):
+    key = CASTLING_KEYS[castling]
+    if ep_square is not None:
+        key ^= EP_KEYS[ep_square[1]]
+    return key
+
+
+def compute_hash(matrix, white_to_move=True, castling=0, ep_square=None):
+    # full recompute, only needed when a position is set up from scratch
+    key = state_key(castling, ep_square)
+    for x, row in enumerate(matrix):
+        for y, piece in enumerate(row):
+            key ^= PIECE_KEYS[piece + 6][x * 8 + y]
+    if not white_to_move:
+        key ^= SIDE_KEY
+    return key
@@ -0,0 +1,316 @@
+import time
+
+from ..backend.api import API
+from ..backend.tables import MOVES
+from ..backend.moves import SQUARE_MASK, CAPTURE, PROMOTION
+from .base import BaseEngine
+from .evaluation import IncrementalEval
+from .movepicker import MoveOrderer
+from .quiescence import MATE, quiescence
+from .tt import TranspositionTable, EXACT, LOWER, UPPER
+
+# scores beyond this are mates, they get ply-adjusted going in and out of the tt
+MATE_BOUND = MATE - 1000
+INF = MATE + 1
+
+# null move pruning: the pass is searched this much shallower, one more ply
+# from NULL_DEEP on, and only at depths where that still leaves a search
+NULL_REDUCTION = 2
+NULL_DEEP = 7
+NULL_MIN_DEPTH = 3
+# late move reductions: quiet moves after the first LMR_MOVES are searched a
+# ply shallower (two after LMR_LATE moves at LMR_DEEP and beyond) and again
+# at full depth only when they beat alpha anyway
+LMR_MOVES = 3
+LMR_MIN_DEPTH = 3
+LMR_LATE = 8
+LMR_DEEP = 6
+
+
+class AlphaBetaEngine(BaseEngine):
+    # negamax with alpha-beta pruning inside an iterative deepening loop.
+    # the search stops at max_depth, after time_limit seconds or after
+    # node_limit nodes, whichever comes first, and plays the best move of the
+    # last iteration that finished.
+
+    def __init__(
+        self,
+        api: API,
+        max_depth=64,
+        time_limit=1.0,
+        node_limit=None,
+        tt_mb=16,
+        quiescence=True,
+        null_move=True,
+        lmr=True,
+    ):
+        super().__init__(api)
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.eval = IncrementalEval()
+        self.tt = TranspositionTable(tt_mb)
+        self.ordering = MoveOrderer()
+        # follow captures and promotions past the horizon, False scores the
+        # leaves as they stand
+        self.quiescence = quiescence
+        # selective search, both off gives the full width tree
+        self.null_move = null_move
+        self.lmr = lmr
+        # packed moves (squares only) the root is limited to, None for all
+        self.root_moves = None
+
+        self.nodes = 0
+        # beta cutoffs, and how many of them came from the first move tried
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.stopped = False
+        self.deadline = None
+        # set by start_clock, the next search keeps the limits it armed
+        self.armed = False
+        self.completed_depth = 0
+        self.best_score = 0
+        # (depth, packed best move, score) of every finished iteration
+        self.iterations = []
+        # called as on_iteration(depth, move, score) after each one, e.g. to
+        # print uci info lines while the search goes on
+        self.on_iteration = None
+
+    def stop(self):
+        self.stopped = True
+
+    def start_clock(self):
+        # clears the stop flag and starts the clock for the next search.
+        # get_best_move does this itself unless it was done beforehand, as a
+        # caller on another thread does so that an early stop() isn't lost
+        self.stopped = False
+        self.deadline = None
+        if self.time_limit is not None:
+            self.deadline = time.perf_counter() + self.time_limit
+        self.armed = True
+
+    def evaluate(self, color):
+        return self.eval.evaluate(color)
+
+    def check_limits(self):
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            self.stopped = True
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+
+    def visit(self):
+        # node hook for the quiescence search, True once the search must stop
+        self.nodes += 1
+        if self.nodes & 1023 == 0 or self.node_limit is not None:
+            self.check_limits()
+        return self.stopped
+
+    def negamax(self, depth, alpha, beta, ply):
+        pos = self.pos
+        # fifty moves without a capture or pawn move draw, unless the last of
+        # them mated. checked before the tt, whose scores don't know the clock
+        if pos.halfmove_clock >= 100:
+            if pos.in_check() and not pos.legal_moves_packed():
+                return -MATE + ply
+            return 0
+        if depth == 0 and self.quiescence:
+            return quiescence(pos, self.evaluate, alpha, beta, self.visit)
+
+        self.nodes += 1
+        if self.nodes & 1023 == 0 or self.node_limit is not None:
+            self.check_limits()
+        if self.stopped:
+            return 0
+
+        if depth == 0:
+            return self.evaluate(pos.turn)
+
+        key = pos.hash
+        alpha_orig = alpha
+
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, tt_score, tt_bound, tt_move = entry
+            if tt_depth >= depth:
+                tt_score = score_from_tt(tt_score, ply)
+                if tt_bound == EXACT:
+                    return tt_score
+                if tt_bound == LOWER and tt_score > alpha:
+                    alpha = tt_score
+                elif tt_bound == UPPER and tt_score < beta:
+                    beta = tt_score
+                if alpha >= beta:
+                    return tt_score
+
+        in_check = (self.null_move or self.lmr) and pos.in_check()
+
+        # give the opponent a free move: if a shallower search still fails
+        # high, the real moves will too. never twice in a row, never in check,
+        # never near a mate score, and not with only king and pawns, where
+        # having to move is often the problem
+        if (
+            self.null_move
+            and depth >= NULL_MIN_DEPTH
+            and not in_check
+            and beta < MATE_BOUND
+            and pos.stack
+            and pos.stack[-1][0] is not None
+            and pos.board.has_pieces(pos.turn == "white")
+        ):
+            r = NULL_REDUCTION + (depth >= NULL_DEEP)
+            pos.push_null()
+            score = -self.negamax(depth - 1 - r, -beta, -beta + 1, ply + 1)
+            pos.pop()
+            if self.stopped:
+                return 0
+            if score >= beta:
+                return beta
+
+        reduce = self.lmr and depth >= LMR_MIN_DEPTH and not in_check
+        best = -INF
+        best_move = None
+        searched = 0
+        for move in self.ordering.moves(pos.board, pos.turn, ply, tt_move):
+            searched += 1
+            pos.push_packed(move)
+            if (
+                reduce
+                and searched > LMR_MOVES
+                and not move & (CAPTURE | PROMOTION)
+                and not pos.in_check()
+            ):
+                r = 1 + (searched > LMR_LATE and depth >= LMR_DEEP)
+                score = -self.negamax(depth - 1 - r, -alpha - 1, -alpha, ply + 1)
+                if score > alpha:
+                    score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            pos.pop()
+
+            if self.stopped:
+                return 0
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        if searched == 1:
+                            self.first_cutoffs += 1
+                        if not move & (CAPTURE | PROMOTION):
+                            self.ordering.cutoff(pos.turn, move, depth, ply)
+                        break
+
+        if best_move is None:
+            return -MATE + ply if pos.in_check() else 0
+
+        if best <= alpha_orig:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, score_to_tt(best, ply), bound, best_move)
+        return best
+
+    def search_root(self, depth, moves):
+        pos = self.pos
+        alpha = -INF
+        best_move = None
+        for move in moves:
+            pos.push_packed(move)
+            score = -self.negamax(depth - 1, -INF, -alpha, 1)
+            pos.pop()
+
+            if self.stopped:
+                return None, 0
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self.tt.store(pos.hash, depth, score_to_tt(alpha, 0), EXACT, best_move)
+        return best_move, alpha
+
+    def principal_variation(self, length):
+        # the line the search expects, read back from the hash moves in the tt
+        pos = self.pos
+        line = []
+        while len(line) < length:
+            entry = self.tt.probe(pos.hash)
+            if entry is None or entry[3] is None:
+                break
+            move = entry[3]
+            legal = [m for m in pos.legal_moves_packed() if m & SQUARE_MASK == move]
+            if not legal:
+                break
+            line.append(legal[0])
+            pos.push_packed(legal[0])
+        for _ in line:
+            pos.pop()
+        return line
+
+    def get_best_move(self):
+        self.pos = self.api.position()
+        self.board = self.pos.board
+
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.completed_depth = 0
+        self.best_score = 0
+        self.iterations = []
+        self.ordering.new_search()
+        if not self.armed:
+            self.start_clock()
+        self.armed = False
+
+        # a search limited to some root moves is not asked to play the book
+        if self.root_moves is None:
+            move = self.book_move()
+            if move is not None:
+                return move
+
+        moves = self.pos.legal_moves_packed()
+        if self.root_moves is not None:
+            moves = [m for m in moves if m & SQUARE_MASK in self.root_moves]
+        if not moves:
+            return None
+
+        best_move = moves[0]
+        self.eval.attach(self.board)
+        try:
+            for depth in range(1, self.max_depth + 1):
+                move, score = self.search_root(depth, moves)
+                if move is None:
+                    break
+                best_move = move
+                self.best_score = score
+                self.completed_depth = depth
+                self.iterations.append((depth, move, score))
+                if self.on_iteration is not None:
+                    self.on_iteration(depth, move, score)
+                # search the previous best first, it is the most likely to hold
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(score) >= MATE_BOUND:
+                    break
+        finally:
+            self.eval.detach()
+        return MOVES[best_move & SQUARE_MASK]
+
+
+def score_to_tt(score, ply):
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
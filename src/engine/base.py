@@ -2,8 +2,18 @@ from ..backend.api import API
 
 
 class BaseEngine:
-    def __init__(self, api: API):
+    def __init__(self, api: API, book=None):
         self.api = api
+        # an OpeningBook (see book.py) asked before searching, None for none
+        self.book = book
+        # pick the heaviest book move instead of a weighted random one
+        self.book_best = False
+
+    def book_move(self):
+        # the book's move for the current position, None when out of book
+        if self.book is None:
+            return None
+        return self.book.choose(self.api.g, best=self.book_best)
 
     def get_best_move(self):
         # ((fx,fy),(tx,ty)) or None
@@ -0,0 +1,100 @@
+from ..backend.api import API
+from .alphabeta import AlphaBetaEngine, MATE
+from .evaluation import MG, EG, PHASE, MAX_PHASE
+from .tt import EXACT
+
+# numpy is only needed here and is imported on first use, the rest of the
+# project keeps running without it
+np = None
+
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError(
+                "batched evaluation needs numpy, install it with pip install numpy"
+            ) from e
+        np = numpy
+    return np
+
+
+def encode(board):
+    # the 64 piece codes of a board, square x * 8 + y, as a plain list
+    squares = getattr(board, "squares", None)
+    if squares is not None:
+        return squares[:]
+    return [piece for row in board.board for piece in row]
+
+
+class BatchEvaluator:
+    # scores many positions in one vectorised call. a batch is an (N, 64) int8
+    # array of the board's piece codes, every code picks a row of the (13, 64)
+    # weight tables below. the defaults are the tapered piece-square tables of
+    # evaluation.py, so batched and scalar scores agree exactly, but any
+    # per-square linear weights can be passed in.
+
+    def __init__(self, mg=MG, eg=EG, phase=PHASE):
+        np = _numpy()
+        self.mg = np.array(mg, dtype=np.int32)
+        self.eg = np.array(eg, dtype=np.int32)
+        self.phase = np.array(phase, dtype=np.int32)
+        self.columns = np.arange(64)
+
+    def batch(self, rows):
+        return np.array(rows, dtype=np.int8)
+
+    def score(self, positions):
+        # white's score of every row, as an int array
+        idx = positions.astype(np.intp) + 6
+        mg = self.mg[idx, self.columns].sum(axis=1)
+        eg = self.eg[idx, self.columns].sum(axis=1)
+        phase = np.minimum(self.phase[idx].sum(axis=1), MAX_PHASE)
+        return (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+
+class BatchedAlphaBetaEngine(AlphaBetaEngine):
+    # AlphaBetaEngine that evaluates the last ply in batches: at depth 1 every
+    # child is a leaf, so the children are collected into one array and scored
+    # in one call instead of one evaluate() each. it searches the same tree
+    # minus the alpha-beta pruning among those leaves, which costs nothing
+    # once they are all scored anyway.
+
+    def __init__(self, api: API, evaluator=None, **kwargs):
+        # the leaves are scored as they stand, that is what gets batched
+        kwargs.setdefault("quiescence", False)
+        super().__init__(api, **kwargs)
+        self.batch_eval = evaluator if evaluator is not None else BatchEvaluator()
+
+    def negamax(self, depth, alpha, beta, ply):
+        if depth != 1:
+            return super().negamax(depth, alpha, beta, ply)
+
+        self.nodes += 1
+        if self.nodes & 1023 == 0 or self.node_limit is not None:
+            self.check_limits()
+        if self.stopped:
+            return 0
+
+        pos = self.pos
+        moves = pos.legal_moves_packed()
+        if not moves:
+            return -MATE + ply if pos.in_check() else 0
+        if pos.halfmove_clock >= 100:
+            return 0
+
+        rows = []
+        for move in moves:
+            pos.push_packed(move)
+            rows.append(encode(pos.board))
+            pos.pop()
+        self.nodes += len(moves)
+
+        scores = self.batch_eval.score(self.batch_eval.batch(rows))
+        if pos.turn == "black":
+            scores = -scores
+        best = int(scores.argmax())
+        self.tt.store(pos.hash, 1, int(scores[best]), EXACT, moves[best])
+        return int(scores[best])
@@ -0,0 +1,164 @@
+import mmap
+import random
+import struct
+
+from ..backend.board import WPAWN, WROOK, WKING
+from .random64 import RANDOM64, CASTLE_OFFSET, EP_OFFSET, TURN_OFFSET
+
+# polyglot layout: 16 byte big endian entries sorted by key
+#   key u64, move u16, weight u16, learn u32
+ENTRY = struct.Struct(">QHHI")
+
+# a polyglot move is to file | to row << 3 | from file << 6 | from row << 9
+# (| promotion << 12), rows counted from white's side. castling is written as
+# the king taking its own rook.
+CASTLING_TARGETS = {2: 0, 6: 7}
+ROOK_FILES = {0: 2, 7: 6}
+QUEEN_PROMOTION = 4
+
+
+def polyglot_key(game):
+    # the key polyglot books are written with, so any .bin book can be read
+    board = game.board
+    b = board.board
+    key = 0
+    for x in range(8):
+        for y in range(8):
+            piece = b[x][y]
+            if piece:
+                kind = 2 * (abs(piece) - 1) + (piece > 0)
+                key ^= RANDOM64[64 * kind + 8 * (7 - x) + y]
+    for bit in range(4):
+        if board.castling & (1 << bit):
+            key ^= RANDOM64[CASTLE_OFFSET + bit]
+    # the en passant file only counts when a pawn of the side to move can take
+    if board.ep_square is not None:
+        white = game.turn == "white"
+        x = board.ep_square[0] + (1 if white else -1)
+        y = board.ep_square[1]
+        pawn = WPAWN if white else -WPAWN
+        if any(0 <= f < 8 and b[x][f] == pawn for f in (y - 1, y + 1)):
+            key ^= RANDOM64[EP_OFFSET + y]
+    if game.turn == "white":
+        key ^= RANDOM64[TURN_OFFSET]
+    return key
+
+
+def board_key(game):
+    # our own zobrist hash, much cheaper than polyglot_key. only for books
+    # built with it, e.g. `makebook --zobrist`
+    return game.board.hash
+
+
+def encode_move(board, move):
+    (fx, fy), (tx, ty) = move
+    piece = abs(board.board[fx][fy])
+    if piece == WKING and abs(fy - ty) == 2:
+        ty = CASTLING_TARGETS[ty]
+    encoded = ty | (7 - tx) << 3 | fy << 6 | (7 - fx) << 9
+    if piece == WPAWN and tx in (0, 7):
+        encoded |= QUEEN_PROMOTION << 12
+    return encoded
+
+
+def decode_move(board, encoded):
+    # ((fx, fy), (tx, ty)) of a polyglot move in this position, the move still
+    # has to be checked for legality
+    ty = encoded & 7
+    tx = 7 - ((encoded >> 3) & 7)
+    fy = (encoded >> 6) & 7
+    fx = 7 - ((encoded >> 9) & 7)
+    piece = board.board[fx][fy]
+    if abs(piece) == WKING and fy == 4 and tx == fx and ty in ROOK_FILES:
+        target = board.board[tx][ty]
+        if target == (WROOK if piece > 0 else -WROOK):
+            ty = ROOK_FILES[ty]
+    return (fx, fy), (tx, ty)
+
+
+class OpeningBook:
+    # a polyglot .bin book, memory mapped and binary searched, so only the
+    # pages holding the probed entries are ever read from disk
+    #
+    #   book = OpeningBook("book.bin")
+    #   book.choose(api.g)             weighted random pick, or None
+    #   book.choose(api.g, best=True)  the highest weight
+
+    def __init__(self, path, key_fn=polyglot_key, rng=None):
+        self.path = path
+        self.key_fn = key_fn
+        self.rng = rng or random.Random()
+        self.file = open(path, "rb")
+        size = self.file.seek(0, 2)
+        self.count = size // ENTRY.size
+        # an empty file can't be mapped
+        self.data = b""
+        if size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def entries(self, key):
+        # (move, weight) of every entry for `key`, in file order
+        data = self.data
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ENTRY.unpack_from(data, mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        for i in range(lo, self.count):
+            entry_key, move, weight, _ = ENTRY.unpack_from(data, i * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((move, weight))
+        return found
+
+    def moves(self, game):
+        # (move, weight) of the legal book moves in the game's position
+        board = game.board
+        found = []
+        for encoded, weight in self.entries(self.key_fn(game)):
+            move = decode_move(board, encoded)
+            if game.is_legal(move):
+                found.append((move, weight))
+        return found
+
+    def choose(self, game, best=False):
+        # a book move for the game's position, picked with probability in
+        # proportion to its weight, or the heaviest one. None when out of book
+        found = [(move, weight) for move, weight in self.moves(game) if weight > 0]
+        if not found:
+            return None
+        if best:
+            return max(found, key=lambda entry: entry[1])[0]
+        moves, weights = zip(*found)
+        return self.rng.choices(moves, weights)[0]
+
+
+def write_book(path, weights):
+    # weights: {(key, encoded move): weight}. scaled to fit in 16 bits and
+    # written sorted by key, heaviest move first within a key
+    top = max(weights.values(), default=0)
+    scale = 65535 / top if top > 65535 else 1
+    rows = sorted(
+        (key, -weight, move) for (key, move), weight in weights.items() if weight > 0
+    )
+    with open(path, "wb") as f:
+        for key, weight, move in rows:
+            f.write(ENTRY.pack(key, move, max(1, int(-weight * scale)), 0))
+    return len(rows)
@@ -0,0 +1,217 @@
+from ..backend.board import EMPTY, WKING, WROOK, BROOK
+
+# material and piece-square tables, tapered between middlegame and endgame by
+# how much material is left. the tables are from white's side with a8 first,
+# the same order as the board's x * 8 + y squares; black reads them mirrored.
+
+MATERIAL = [0, 100, 320, 330, 500, 900, 0]
+
+# weight of each piece type in the game phase, MAX_PHASE with everything on
+PHASE_WEIGHTS = [0, 0, 1, 1, 2, 4, 0]
+MAX_PHASE = 24
+
+# fmt: off
+PAWN_MG = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+]
+
+PAWN_EG = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0,
+]
+
+KNIGHT = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+
+BISHOP = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+
+ROOK = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+]
+
+QUEEN = [
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+
+KING_MG = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+]
+
+KING_EG = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]
+# fmt: on
+
+# MG[piece + 6][sq], EG[piece + 6][sq]: material plus square bonus, positive
+# for white pieces and negative for black ones
+MG = [[0] * 64 for _ in range(13)]
+EG = [[0] * 64 for _ in range(13)]
+PHASE = [PHASE_WEIGHTS[abs(p)] for p in range(-6, 7)]
+
+for _piece, _mg, _eg in [
+    (1, PAWN_MG, PAWN_EG),
+    (2, KNIGHT, KNIGHT),
+    (3, BISHOP, BISHOP),
+    (4, ROOK, ROOK),
+    (5, QUEEN, QUEEN),
+    (6, KING_MG, KING_EG),
+]:
+    for _sq in range(64):
+        MG[_piece + 6][_sq] = MATERIAL[_piece] + _mg[_sq]
+        EG[_piece + 6][_sq] = MATERIAL[_piece] + _eg[_sq]
+        # same square seen from black's side is the rank mirror
+        MG[-_piece + 6][_sq] = -(MATERIAL[_piece] + _mg[_sq ^ 56])
+        EG[-_piece + 6][_sq] = -(MATERIAL[_piece] + _eg[_sq ^ 56])
+
+
+def evaluate_full(matrix):
+    # (mg, eg, phase) from scratch, what the incremental totals must match
+    mg = eg = phase = 0
+    for x in range(8):
+        for y in range(8):
+            piece = matrix[x][y]
+            if piece != EMPTY:
+                mg += MG[piece + 6][x * 8 + y]
+                eg += EG[piece + 6][x * 8 + y]
+                phase += PHASE[piece + 6]
+    return mg, eg, phase
+
+
+def taper(mg, eg, phase):
+    # white's score, phase 0 is a bare endgame, promotions can push it past max
+    phase = min(phase, MAX_PHASE)
+    return (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+
+def move_delta(record):
+    # (mg, eg, phase) change made by a move, read off its MoveRecord
+    (fx, fy), (tx, ty) = record.from_sq, record.to_sq
+    frm = fx * 8 + fy
+    to = tx * 8 + ty
+    piece = record.moved_piece
+    landed = piece if record.promotion is None else record.promotion
+
+    mg = MG[landed + 6][to] - MG[piece + 6][frm]
+    eg = EG[landed + 6][to] - EG[piece + 6][frm]
+    phase = PHASE[landed + 6] - PHASE[piece + 6]
+
+    captured = record.captured_piece
+    if captured != EMPTY:
+        sq = to + 8 * piece if record.en_passant else to
+        mg -= MG[captured + 6][sq]
+        eg -= EG[captured + 6][sq]
+        phase -= PHASE[captured + 6]
+
+    # castling moves the rook too
+    if (piece == WKING or piece == -WKING) and abs(fy - ty) == 2:
+        rook = (WROOK if piece > 0 else BROOK) + 6
+        row = fx * 8
+        old, new = (row + 7, row + 5) if ty == 6 else (row, row + 3)
+        mg += MG[rook][new] - MG[rook][old]
+        eg += EG[rook][new] - EG[rook][old]
+
+    return mg, eg, phase
+
+
+class IncrementalEval:
+    # material + piece-square totals that follow the board move by move.
+    # attach() hooks it into the board's apply_move / undo_move, after which
+    # evaluate() is a few additions instead of a scan of all 64 squares.
+
+    def __init__(self):
+        self.board = None
+        self.mg = 0
+        self.eg = 0
+        self.phase = 0
+
+    def attach(self, board):
+        if self.board is not None:
+            self.detach()
+        self.board = board
+        board.evaluator = self
+        self.refresh()
+
+    def detach(self):
+        if self.board is not None and self.board.evaluator is self:
+            self.board.evaluator = None
+        self.board = None
+
+    def refresh(self):
+        self.mg, self.eg, self.phase = evaluate_full(self.board.board)
+
+    def apply(self, record):
+        mg, eg, phase = move_delta(record)
+        self.mg += mg
+        self.eg += eg
+        self.phase += phase
+
+    def revert(self, record):
+        mg, eg, phase = move_delta(record)
+        self.mg -= mg
+        self.eg -= eg
+        self.phase -= phase
+
+    def score(self):
+        return taper(self.mg, self.eg, self.phase)
+
+    def evaluate(self, turn):
+        score = taper(self.mg, self.eg, self.phase)
+        return score if turn == "white" else -score
@@ -1,56 +1,100 @@
 from ..backend.api import API
+from .alphabeta import MATE, score_from_tt, score_to_tt
 from .base import BaseEngine
+from .evaluation import IncrementalEval
+from .quiescence import quiescence
+from .tt import TranspositionTable, EXACT
 
 
 class MinimaxEngine(BaseEngine):
-    def __init__(self, api: API, depth=2):
+    def __init__(self, api: API, depth=2, tt_mb=16, quiescence=True):
         super().__init__(api)
         self.depth = depth
-        self.values = {0: 0, 1: 100, 2: 320, 3: 330, 4: 500, 5: 900, 6: 20000}
-
-    def evaluate_board(self, board, turn):
-        score = 0
-        for row in board:
-            for piece in row:
-                val = self.values.get(abs(piece), 0)
-                score += val if piece > 0 else -val
-        return score if turn == "white" else -score
-
-    def minimax(self, depth, maximizing):
-        state = self.api.get_state()
-        if state["over"] or depth == 0:
-            return self.evaluate_board(state["board"], state["turn"])
-
-        moves = self.api.get_legal_moves()
-        if not moves:
+        # settle captures at the leaves instead of stopping halfway through one
+        self.quiescence = quiescence
+        self.eval = IncrementalEval()
+        # tt_mb=0 turns the transposition table off
+        self.tt = TranspositionTable(tt_mb) if tt_mb else None
+        self.tt_turn = None
+        self.turn = "white"
+
+    def minimax(self, pos, depth, maximizing):
+        # scores are from the point of view of the side at the root (self.turn)
+        ply = pos.ply
+        # fifty moves without a capture or pawn move draw, unless the last of
+        # them mated. checked before the tt, whose scores don't know the clock
+        if pos.halfmove_clock >= 100:
+            if pos.in_check() and not pos.legal_moves():
+                return -MATE + ply if maximizing else MATE - ply
             return 0
+        if depth == 0:
+            if not self.quiescence:
+                return self.eval.evaluate(self.turn)
+            score = quiescence(pos, self.eval.evaluate, -MATE - 1, MATE + 1)
+            return score if pos.turn == self.turn else -score
+
+        key = pos.hash
+        if self.tt is not None:
+            entry = self.tt.probe(key)
+            if entry is not None and entry[0] >= depth:
+                return score_from_tt(entry[1], ply)
+
+        moves = pos.legal_moves()
+        if not moves:
+            if not pos.in_check():
+                return 0
+            # mated, sooner is worse for the loser. counted in plies from the
+            # root, and from this node while in the tt, so a stored mate is
+            # right at whatever depth and iteration it turns up again
+            return -MATE + ply if maximizing else MATE - ply
 
+        best_move = None
         if maximizing:
             best = float("-inf")
             for move in moves:
-                record = self.api.apply_move(move)
-                score = self.minimax(depth - 1, False)
-                self.api.undo_move(move, record)
-                best = max(best, score)
-            return best
+                pos.push(move)
+                score = self.minimax(pos, depth - 1, False)
+                pos.pop()
+                if score > best:
+                    best = score
+                    best_move = move
         else:
             best = float("inf")
             for move in moves:
-                record = self.api.apply_move(move)
-                score = self.minimax(depth - 1, True)
-                self.api.undo_move(move, record)
-                best = min(best, score)
-            return best
+                pos.push(move)
+                score = self.minimax(pos, depth - 1, True)
+                pos.pop()
+                if score < best:
+                    best = score
+                    best_move = move
+
+        if self.tt is not None:
+            self.tt.store(key, depth, score_to_tt(best, ply), EXACT, best_move)
+        return best
 
     def get_best_move(self):
+        move = self.book_move()
+        if move is not None:
+            return move
+
+        pos = self.api.position()
+        self.turn = pos.turn
+        # scores are stored from the point of view of the side we search for
+        if self.tt is not None and self.turn != self.tt_turn:
+            self.tt.clear()
+            self.tt_turn = self.turn
+
         best_move = None
         best_score = float("-inf")
-        moves = self.api.get_legal_moves()
-        for move in moves:
-            record = self.api.apply_move(move)
-            score = self.minimax(self.depth - 1, False)
-            self.api.undo_move(move, record)
-            if score > best_score:
-                best_score = score
-                best_move = move
+        self.eval.attach(pos.board)
+        try:
+            for move in pos.legal_moves():
+                pos.push(move)
+                score = self.minimax(pos, self.depth - 1, False)
+                pos.pop()
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+        finally:
+            self.eval.detach()
         return best_move
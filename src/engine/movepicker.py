@@ -0,0 +1,127 @@
+from ..backend.board import WPAWN, PIECE_VALUES
+from ..backend.move_gen import getLegalMovesPacked
+from ..backend.moves import SQUARE_MASK, EN_PASSANT, PROMOTION, with_flags
+
+MAX_PLY = 128
+# history scores are halved across the board once one of them gets this big,
+# so old cutoffs fade and the numbers stay small ints
+HISTORY_MAX = 1 << 20
+
+
+def mvv_lva(board, move):
+    # most valuable victim first, the least valuable attacker breaks ties
+    if move & EN_PASSANT:
+        victim = WPAWN
+    else:
+        victim = abs(board.piece_at((move >> 6) & 63))
+    return PIECE_VALUES[victim] * 8 - abs(board.piece_at(move & 63))
+
+
+def _hash_move(board, color, hash_move):
+    # the tt keeps full 64 bit keys, so a hash move belongs to this very
+    # position and only gets a cheap check before it is played
+    piece = board.piece_at(hash_move & 63)
+    target = board.piece_at(hash_move >> 6)
+    sign = 1 if color == "white" else -1
+    if piece * sign > 0 and target * sign <= 0:
+        return with_flags(board, hash_move)
+    return None
+
+
+def _captures(board, color):
+    captures = getLegalMovesPacked(board, color, quiets=False)
+    captures.sort(key=lambda m: mvv_lva(board, m), reverse=True)
+    return captures
+
+
+def staged_moves(board, color, hash_move=None, killers=(), history=None):
+    # packed legal moves (see backend/moves.py) of `color`, best guesses first:
+    # the hash move, captures by mvv-lva, promotions, then quiet moves with
+    # the killers leading and the rest sorted by `history` score when given.
+    # every stage is generated and legality checked only once the previous
+    # one is used up, so a cutoff on the hash move or an early capture never
+    # pays for the quiet moves.
+    if hash_move is not None:
+        hash_move &= SQUARE_MASK
+        move = _hash_move(board, color, hash_move)
+        if move is not None:
+            yield move
+        else:
+            hash_move = None
+
+    for move in _captures(board, color):
+        if move & SQUARE_MASK != hash_move:
+            yield move
+
+    quiets = getLegalMovesPacked(board, color, captures=False)
+    for move in quiets:
+        if move & PROMOTION and move & SQUARE_MASK != hash_move:
+            yield move
+
+    played = [hash_move]
+    for killer in killers:
+        if killer and killer not in played:
+            # only a killer that is a legal quiet move here is played
+            for move in quiets:
+                if move & SQUARE_MASK == killer and not move & PROMOTION:
+                    played.append(killer)
+                    yield move
+                    break
+
+    if history is not None:
+        quiets.sort(key=lambda m: history[m & SQUARE_MASK], reverse=True)
+    for move in quiets:
+        if not move & PROMOTION and move & SQUARE_MASK not in played:
+            yield move
+
+
+class MoveOrderer:
+    # what the search learns as it goes, fed to staged_moves: two killer
+    # moves a ply, quiet moves that caused a cutoff in a sibling node, and a
+    # butterfly history table of cutoffs by side, from and to square.
+    #
+    # killers are per-ply lists allocated once and overwritten in place, and
+    # move lists are sorted where they are generated, so a node allocates
+    # nothing for ordering beyond the lists move generation makes anyway.
+
+    def __init__(self, max_ply=MAX_PLY):
+        self.max_ply = max_ply
+        # packed moves, squares only, 0 for an empty slot (a8a8 is never legal)
+        self.killers = [[0, 0] for _ in range(max_ply)]
+        # indexed by from | to << 6, one table a side
+        self.history = {"white": [0] * 4096, "black": [0] * 4096}
+
+    def clear(self):
+        for slots in self.killers:
+            slots[0] = slots[1] = 0
+        for table in self.history.values():
+            table[:] = [0] * 4096
+
+    def new_search(self):
+        # killers belong to the previous tree, history is still worth something
+        for slots in self.killers:
+            slots[0] = slots[1] = 0
+        self.age()
+
+    def age(self):
+        for table in self.history.values():
+            table[:] = [h >> 1 for h in table]
+
+    def cutoff(self, color, move, depth, ply):
+        # a quiet move refuted the node: remember it for the siblings and credit
+        # it in the history table, deeper cutoffs count for more
+        move &= SQUARE_MASK
+        if ply < self.max_ply:
+            slots = self.killers[ply]
+            if slots[0] != move:
+                slots[1] = slots[0]
+                slots[0] = move
+        table = self.history[color]
+        table[move] += depth * depth
+        if table[move] > HISTORY_MAX:
+            self.age()
+
+    def moves(self, board, color, ply, hash_move=None):
+        # staged_moves with this search's killers and history
+        killers = self.killers[ply] if ply < self.max_ply else ()
+        return staged_moves(board, color, hash_move, killers, self.history[color])
@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ..backend.api import API
+from ..backend.tables import MOVES
+from ..backend.moves import SQUARE_MASK
+from .alphabeta import AlphaBetaEngine, MATE_BOUND
+from .base import BaseEngine
+
+# engine of the current worker process, kept between searches so its
+# transposition table stays warm from one move to the next. positions from
+# different games never clash, the tt keeps full 64 bit keys.
+_worker_engine = None
+
+
+def worker_engine(api, tt_mb=16):
+    # the worker's engine, searching `api` from now on over all root moves
+    global _worker_engine
+    engine = _worker_engine
+    if engine is None or engine.tt.size_mb != tt_mb:
+        engine = _worker_engine = AlphaBetaEngine(api, tt_mb=tt_mb)
+    engine.api = api
+    engine.root_moves = None
+    return engine
+
+
+def _ready():
+    return os.getpid()
+
+
+def search_root_moves(board, turn, halfmove_clock, root_moves, limits):
+    # runs in a worker: iterative deepening over root_moves only. returns the
+    # (depth, move, score) of every finished iteration and the node count.
+    max_depth, time_limit, node_limit, tt_mb = limits
+
+    api = API(type(board))
+    api.g.board = board
+    api.g.turn = turn
+    api.g.halfmove_clock = halfmove_clock
+
+    engine = worker_engine(api, tt_mb)
+    engine.max_depth = max_depth
+    engine.time_limit = time_limit
+    engine.node_limit = node_limit
+    engine.root_moves = set(root_moves)
+
+    engine.get_best_move()
+    return engine.iterations, engine.nodes
+
+
+def pick_result(results):
+    # best move over every worker's share of the root, compared at the deepest
+    # depth all of them finished. a worker that stopped early on a mate score
+    # has a proven result and does not hold the others back.
+    finished = [its for its in results if its]
+    if not finished:
+        return None, 0, 0
+    open_depths = [its[-1][0] for its in finished if abs(its[-1][2]) < MATE_BOUND]
+    depth = min(open_depths) if open_depths else max(its[-1][0] for its in finished)
+
+    best = None
+    for its in finished:
+        entry = [it for it in its if it[0] <= depth][-1]
+        if best is None or entry[2] > best[2]:
+            best = entry
+    return best[1], best[2], depth
+
+
+class ParallelEngine(BaseEngine):
+    # root splitting over a process pool. the legal root moves are dealt out
+    # round robin, every worker runs AlphaBetaEngine's iterative deepening on
+    # its share under the same limits (node_limit is per worker), and the best
+    # of the shares wins. processes rather than threads, the search is pure
+    # python and holds the GIL the whole time.
+
+    def __init__(
+        self,
+        api: API,
+        workers=None,
+        max_depth=64,
+        time_limit=1.0,
+        node_limit=None,
+        tt_mb=16,
+    ):
+        super().__init__(api)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.tt_mb = tt_mb
+        self.pool = None
+
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_score = 0
+        self.start()
+
+    def start(self):
+        # spawn the workers up front, every worker search starts its own clock
+        # so time spent starting processes would come on top of time_limit
+        if self.pool is not None or self.workers < 2:
+            return
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        for f in [self.pool.submit(_ready) for _ in range(self.workers)]:
+            f.result()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_best_move(self):
+        move = self.book_move()
+        if move is not None:
+            self.nodes = self.completed_depth = self.best_score = 0
+            return move
+
+        pos = self.api.position()
+        moves = pos.legal_moves_packed()
+        if not moves:
+            return None
+
+        shares = [
+            [m & SQUARE_MASK for m in moves[i :: self.workers]]
+            for i in range(min(self.workers, len(moves)))
+        ]
+        limits = (self.max_depth, self.time_limit, self.node_limit, self.tt_mb)
+        args = (pos.board, pos.turn, pos.halfmove_clock)
+
+        if len(shares) == 1:
+            outcomes = [search_root_moves(*args, shares[0], limits)]
+        else:
+            self.start()
+            futures = [
+                self.pool.submit(search_root_moves, *args, share, limits)
+                for share in shares
+            ]
+            outcomes = [f.result() for f in futures]
+
+        self.nodes = sum(nodes for _, nodes in outcomes)
+        move, score, depth = pick_result([its for its, _ in outcomes])
+        self.best_score = score
+        self.completed_depth = depth
+        if move is None:
+            move = moves[0]
+        return MOVES[move & SQUARE_MASK]
@@ -0,0 +1,141 @@
+from ..backend.board import WPAWN, WQUEEN, EMPTY, PIECE_VALUES
+from ..backend.bitboard import BitboardBoard
+from ..backend.move_gen import getLegalMovesPacked, getSmallestAttacker
+from ..backend.moves import CAPTURE, EN_PASSANT, PROMOTION
+from ..backend.tables import SQUARES
+from .movepicker import mvv_lva
+
+# a mate this many plies from the root scores MATE - ply
+MATE = 100000
+
+SEE_VALUES = PIECE_VALUES
+PROMOTION_GAIN = SEE_VALUES[WQUEEN] - SEE_VALUES[WPAWN]
+# a capture is only tried if winning the victim could lift the score to within
+# this much of alpha, positional swings included
+DELTA_MARGIN = 200
+
+
+def see(board, move):
+    # static exchange evaluation of a packed capture: the material the side to
+    # move ends up with once both sides have captured on the target square with
+    # their cheapest pieces for as long as it pays. pins are not looked at.
+    frm = move & 63
+    to = (move >> 6) & 63
+    tx, ty = SQUARES[to]
+    # the exchange is played out on a copy of the 64 squares, the board the
+    # search stands on is never touched
+    if isinstance(board, BitboardBoard):
+        squares = board.squares[:]
+    else:
+        squares = [piece for row in board.board for piece in row]
+    attacker = squares[frm]
+    white = attacker > 0
+
+    if move & EN_PASSANT:
+        gain = [SEE_VALUES[WPAWN]]
+    else:
+        gain = [SEE_VALUES[abs(squares[to])]]
+    on_square = SEE_VALUES[abs(attacker)]
+    if move & PROMOTION:
+        gain[0] += PROMOTION_GAIN
+        on_square = SEE_VALUES[WQUEEN]
+
+    # pieces come off the squares as they capture, which uncovers the sliders
+    # behind them
+    squares[frm] = EMPTY
+    if move & EN_PASSANT:
+        # the pawn taken en passant stands beside the capturing one
+        squares[(frm & ~7) | ty] = EMPTY
+    while True:
+        # what the other side wins by taking back, if it can
+        gain.append(on_square - gain[-1])
+        # neither standing pat nor going on can make it good for them
+        if max(-gain[-2], gain[-1]) < 0:
+            break
+        white = not white
+        square = getSmallestAttacker(squares, tx, ty, white)
+        if square is None:
+            break
+        sq = square[0] * 8 + square[1]
+        on_square = SEE_VALUES[abs(squares[sq])]
+        squares[sq] = EMPTY
+
+    # the last entry was never played. going back, each side may stop
+    # capturing instead
+    gain.pop()
+    while len(gain) > 1:
+        last = gain.pop()
+        gain[-1] = -max(-gain[-1], last)
+    return gain[0]
+
+
+def tactical_moves(board, color):
+    # packed captures, best victim first, then promotions that capture nothing
+    moves = getLegalMovesPacked(board, color, quiets=False)
+    moves.sort(key=lambda m: mvv_lva(board, m), reverse=True)
+    # the quiet moves are only generated when a pawn is one step from promoting
+    pawn = WPAWN if color == "white" else -WPAWN
+    seventh = range(8, 16) if color == "white" else range(48, 56)
+    if any(board.piece_at(sq) == pawn for sq in seventh):
+        quiets = getLegalMovesPacked(board, color, captures=False)
+        moves += [m for m in quiets if m & PROMOTION]
+    return moves
+
+
+def quiescence(pos, evaluate, alpha, beta, visit=None):
+    # negamax over captures and promotions only, so leaves are scored once the
+    # position is quiet rather than in the middle of an exchange. scores are
+    # for the side to move, who may always stand pat on the static score.
+    # visit() is called once a node and stops the search by returning True.
+    if visit is not None and visit():
+        return 0
+
+    board = pos.board
+    in_check = pos.in_check()
+    if in_check:
+        # no standing pat in check: every evasion is searched, and having none
+        # is mate
+        moves = pos.legal_moves_packed()
+        best = -MATE + pos.ply
+        if not moves:
+            return best
+        moves.sort(key=lambda m: m & CAPTURE and mvv_lva(board, m), reverse=True)
+    else:
+        stand_pat = evaluate(pos.turn)
+        if stand_pat >= beta:
+            return stand_pat
+        # not even a queen and a promotion would be enough
+        if stand_pat + SEE_VALUES[WQUEEN] + PROMOTION_GAIN + DELTA_MARGIN < alpha:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        best = stand_pat
+        moves = tactical_moves(board, pos.turn)
+
+    for move in moves:
+        if not in_check and not move & PROMOTION:
+            if move & EN_PASSANT:
+                victim = SEE_VALUES[WPAWN]
+            else:
+                victim = SEE_VALUES[abs(board.piece_at((move >> 6) & 63))]
+            # delta pruning
+            if stand_pat + victim + DELTA_MARGIN <= alpha:
+                continue
+            # taking with a cheaper piece never loses, the rest get an exchange
+            # evaluation and losing captures are dropped
+            if SEE_VALUES[abs(board.piece_at(move & 63))] > victim and (
+                see(board, move) < 0
+            ):
+                continue
+
+        pos.push_packed(move)
+        score = -quiescence(pos, evaluate, -beta, -alpha, visit)
+        pos.pop()
+
+        if score > best:
+            best = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+    return best
@@ -0,0 +1,113 @@
+from array import array
+
+from ..backend.moves import pack, unpack, SQUARE_MASK
+
+# bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# key (8) + score (4) + depth (1) + bound (1) + move (2)
+ENTRY_BYTES = 16
+
+
+def pack_move(move):
+    # the squares of a packed move (moves.py), 0 = none. flags are dropped so
+    # the field stays 16 bits, packed ints are accepted as well as tuples
+    if move is None:
+        return 0
+    if isinstance(move, int):
+        return move & SQUARE_MASK
+    return pack(move)
+
+
+def unpack_move(code):
+    if code == 0:
+        return None
+    return unpack(code)
+
+
+class TranspositionTable:
+    # fixed size table of two-slot buckets. slot 0 of a bucket is depth
+    # preferred and only gives way to an equal or deeper search, slot 1 is
+    # always replaced. the fields live in flat arrays so the memory used is
+    # exactly what was asked for and does not grow while searching.
+
+    def __init__(self, size_mb=16):
+        self.size_mb = size_mb
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self.clear()
+
+    def clear(self):
+        slots = self.buckets * 2
+        self.keys = array("Q", bytes(8 * slots))
+        self.scores = array("i", bytes(4 * slots))
+        self.depths = array("b", [-1]) * slots  # -1 marks an empty slot
+        self.bounds = array("B", bytes(slots))
+        self.moves = array("H", bytes(2 * slots))
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def probe(self, key):
+        # returns (depth, score, bound, move) or None, the move packed (squares
+        # only, see backend/moves.py) and None if the entry has none
+        slot = (key % self.buckets) * 2
+        keys = self.keys
+        depths = self.depths
+        for s in (slot, slot + 1):
+            if keys[s] == key and depths[s] >= 0:
+                self.hits += 1
+                return (
+                    depths[s],
+                    self.scores[s],
+                    self.bounds[s],
+                    self.moves[s] or None,
+                )
+        self.misses += 1
+        # the bucket is in use, just by other positions
+        if depths[slot] >= 0 or depths[slot + 1] >= 0:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, move=None):
+        slot = (key % self.buckets) * 2
+        keys = self.keys
+        depths = self.depths
+        self.stores += 1
+
+        if keys[slot] == key or depths[slot] < 0 or depth >= depths[slot]:
+            # demote the old depth-preferred entry instead of losing it
+            if keys[slot] != key and depths[slot] >= 0:
+                self._copy(slot, slot + 1)
+            target = slot
+        else:
+            target = slot + 1
+
+        keys[target] = key
+        depths[target] = min(depth, 127)
+        self.scores[target] = score
+        self.bounds[target] = bound
+        self.moves[target] = pack_move(move)
+
+    def _copy(self, src, dst):
+        self.keys[dst] = self.keys[src]
+        self.depths[dst] = self.depths[src]
+        self.scores[dst] = self.scores[src]
+        self.bounds[dst] = self.bounds[src]
+        self.moves[dst] = self.moves[src]
+
+    def hashfull(self):
+        # permille of used slots, estimated from the first 1000 like uci does
+        sample = min(1000, len(self.depths))
+        used = sum(1 for d in self.depths[:sample] if d >= 0)
+        return used * 1000 // sample
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hashfull": self.hashfull(),
+        }
@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .backend.api import API
+from .backend.bitboard import BitboardBoard
+from .backend.fen import game_from_fen
+from .engine.parallel import worker_engine
+from .uci import move_to_uci, parse_move
+
+# sessions idle for longer than this are dropped, and past MAX_SESSIONS the
+# least recently used one makes room for a new game
+SESSION_TTL = 30 * 60
+MAX_SESSIONS = 10000
+EVICT_EVERY = 30
+
+# every request is answered within this many seconds, engine moves included
+REQUEST_TIMEOUT = 10.0
+# kept back from the deadline for the round trip to the worker
+ENGINE_OVERHEAD = 0.25
+ENGINE_TIME = 1.0
+MAX_ENGINE_TIME = 5.0
+# engine moves waiting for a worker, per worker, before new ones get a 503
+ENGINE_QUEUE = 4
+
+MAX_BODY = 64 * 1024
+
+
+def engine_move(fen, time_limit, max_depth):
+    # runs in a worker: the uci text of the engine's move from `fen`, or None
+    api = API(BitboardBoard)
+    api.g = game_from_fen(fen, BitboardBoard)
+    engine = worker_engine(api)
+    engine.time_limit = time_limit
+    engine.max_depth = max_depth
+    move = engine.get_best_move()
+    return None if move is None else move_to_uci(api.g.board, move)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Session:
+    def __init__(self, api):
+        self.api = api
+        self.last_used = time.monotonic()
+        # one request at a time changes a game, an engine move included
+        self.lock = asyncio.Lock()
+
+
+def game_state(api):
+    g = api.g
+    return {
+        "fen": g.to_fen(),
+        "turn": g.turn,
+        "over": g.game_over,
+        "result": g.result,
+        "can_undo": g.can_undo(),
+        "can_redo": g.can_redo(),
+    }
+
+
+class GameServer:
+    # a plain ASGI app, run it with `uvicorn src.server:app` or `python -m
+    # src.server`. games live in memory, engine searches run in a bounded
+    # process pool so the event loop only ever waits on them.
+    #
+    #   POST   /games                 {"fen": ...} optional, new game
+    #   GET    /games/{id}            state
+    #   GET    /games/{id}/moves      legal moves in uci
+    #   POST   /games/{id}/move       {"move": "e2e4"}
+    #   POST   /games/{id}/undo
+    #   POST   /games/{id}/redo
+    #   POST   /games/{id}/engine     {"time": 0.5, "depth": 6} both optional
+    #   DELETE /games/{id}
+    #   GET    /health
+
+    def __init__(
+        self,
+        workers=None,
+        session_ttl=SESSION_TTL,
+        max_sessions=MAX_SESSIONS,
+        request_timeout=REQUEST_TIMEOUT,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.request_timeout = request_timeout
+        # id -> Session, least recently used first
+        self.sessions = OrderedDict()
+        self.pool = None
+        self.engine_jobs = 0
+        self.evictor = None
+        self.stats = {
+            "requests": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "evicted": 0,
+            "errors": 0,
+        }
+
+    # LIFECYCLE
+
+    def start(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        if self.evictor is None:
+            self.evictor = asyncio.get_running_loop().create_task(self.evict_loop())
+
+    async def stop(self):
+        if self.evictor is not None:
+            self.evictor.cancel()
+            self.evictor = None
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def evict_loop(self):
+        while True:
+            await asyncio.sleep(EVICT_EVERY)
+            self.evict_idle()
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.session_ttl
+        while self.sessions:
+            game_id, session = next(iter(self.sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self.sessions[game_id]
+            self.stats["evicted"] += 1
+
+    # ASGI
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+
+        self.stats["requests"] += 1
+        self.start()
+        try:
+            body = await read_body(receive)
+            status, payload = await asyncio.wait_for(
+                self.route(scope["method"], scope["path"], body),
+                self.request_timeout,
+            )
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            status, payload = 504, {"error": "deadline exceeded"}
+        except Exception as e:
+            # a bug still gets a json answer, and the connection isn't dropped
+            self.stats["errors"] += 1
+            status, payload = 500, {"error": f"internal error: {type(e).__name__}"}
+        await send_json(send, status, payload)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ROUTES
+
+    async def route(self, method, path, body):
+        parts = [p for p in path.split("/") if p]
+        if parts == ["health"] and method == "GET":
+            return 200, {
+                "sessions": len(self.sessions),
+                "workers": self.workers,
+                "engine_jobs": self.engine_jobs,
+                **self.stats,
+            }
+        if not parts or parts[0] != "games" or len(parts) > 3:
+            raise HTTPError(404, "not found")
+        if len(parts) == 1:
+            if method != "POST":
+                raise HTTPError(405, "method not allowed")
+            return self.new_game(body)
+
+        game_id = parts[1]
+        action = parts[2] if len(parts) == 3 else None
+        session = self.session(game_id)
+        if action is None and method == "DELETE":
+            del self.sessions[game_id]
+            return 200, {"deleted": game_id}
+
+        handler = {
+            (None, "GET"): self.get_state,
+            ("moves", "GET"): self.get_moves,
+            ("move", "POST"): self.make_move,
+            ("undo", "POST"): self.undo,
+            ("redo", "POST"): self.redo,
+            ("engine", "POST"): self.engine_move,
+        }.get((action, method))
+        if handler is None:
+            raise HTTPError(404, "not found")
+        async with session.lock:
+            result = await handler(session, body)
+            session.last_used = time.monotonic()
+            return result
+
+    def session(self, game_id):
+        session = self.sessions.get(game_id)
+        if session is None:
+            raise HTTPError(404, f"no game {game_id!r}")
+        self.sessions.move_to_end(game_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def new_game(self, body):
+        api = API(BitboardBoard)
+        fen = body.get("fen")
+        if fen is not None and not isinstance(fen, str):
+            raise HTTPError(400, "fen must be a string")
+        if fen:
+            try:
+                api.load_fen(fen)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+        self.evict_idle()
+        while len(self.sessions) >= self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.stats["evicted"] += 1
+        game_id = secrets.token_hex(8)
+        self.sessions[game_id] = Session(api)
+        return 201, {"id": game_id, **game_state(api)}
+
+    async def get_state(self, session, body):
+        return 200, game_state(session.api)
+
+    async def get_moves(self, session, body):
+        api = session.api
+        moves = [move_to_uci(api.g.board, m) for m in api.get_legal_moves()]
+        return 200, {"moves": moves}
+
+    async def make_move(self, session, body):
+        api = session.api
+        if api.g.game_over:
+            raise HTTPError(409, "game is over")
+        text = body.get("move")
+        if not isinstance(text, str):
+            raise HTTPError(400, "move must be a string")
+        try:
+            move = parse_move(text)
+        except ValueError:
+            raise HTTPError(400, f"invalid move {text!r}")
+        if not api.is_legal(move):
+            raise HTTPError(400, f"illegal move {text!r}")
+        api.make_move(move)
+        return 200, game_state(api)
+
+    async def undo(self, session, body):
+        if not session.api.undo():
+            raise HTTPError(409, "nothing to undo")
+        return 200, game_state(session.api)
+
+    async def redo(self, session, body):
+        if not session.api.redo():
+            raise HTTPError(409, "nothing to redo")
+        return 200, game_state(session.api)
+
+    def engine_job_done(self):
+        self.engine_jobs -= 1
+
+    async def engine_move(self, session, body):
+        api = session.api
+        if api.g.game_over:
+            raise HTTPError(409, "game is over")
+        # a full queue is answered straight away rather than at the deadline
+        if self.engine_jobs >= self.workers * (1 + ENGINE_QUEUE):
+            self.stats["rejected"] += 1
+            raise HTTPError(503, "engine busy")
+
+        try:
+            think = float(body.get("time", ENGINE_TIME))
+            depth = int(body.get("depth", 64))
+        except (TypeError, ValueError, OverflowError):
+            raise HTTPError(400, "time and depth must be numbers")
+        # a nan or infinite time would never let the worker's search stop
+        if not math.isfinite(think) or think <= 0:
+            raise HTTPError(400, "time must be a positive number of seconds")
+        if depth < 1:
+            raise HTTPError(400, "depth must be at least 1")
+        # the search has to end before the request does, waiting for a worker
+        # included, so it is sized for the worst case of a full queue
+        worst_wait = self.request_timeout / (1 + ENGINE_QUEUE)
+        think = min(think, MAX_ENGINE_TIME, worst_wait - ENGINE_OVERHEAD)
+
+        loop = asyncio.get_running_loop()
+        future = self.pool.submit(engine_move, api.get_fen(), max(think, 0.01), depth)
+        # counted until the worker is done with it, a request that timed out
+        # still keeps its worker busy until the search runs out of time
+        self.engine_jobs += 1
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self.engine_job_done)
+        )
+        text = await asyncio.wrap_future(future)
+        if text is None:
+            raise HTTPError(409, "no legal moves")
+        api.make_move(parse_move(text))
+        return 200, {"move": text, **game_state(api)}
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            raise HTTPError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    if not size:
+        return {}
+    try:
+        body = json.loads(b"".join(chunks))
+    except ValueError:
+        raise HTTPError(400, "body is not json")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "body must be a json object")
+    return body
+
+
+async def send_json(send, status, payload):
+    data = json.dumps(payload).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(data)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": data})
+
+
+app = GameServer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="chess games over http")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, help="engine processes")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("the server needs uvicorn: pip install uvicorn", file=sys.stderr)
+        return 1
+    server = GameServer(workers=args.workers, request_timeout=args.timeout)
+    uvicorn.run(server, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
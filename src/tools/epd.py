@@ -0,0 +1,139 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from ..backend.api import API
+from ..backend.board import Board
+from ..backend.bitboard import BitboardBoard
+from ..backend.san import move_to_san, san_to_move
+from ..engine.alphabeta import AlphaBetaEngine
+
+
+def parse_epd(line):
+    # (fen, {opcode: [operands]}) of one epd record. the four position fields
+    # become a fen with zeroed clocks unless hmvc / fmvn say otherwise.
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise ValueError(f"invalid epd: {line!r}")
+    ops = {}
+    for op in (fields[4] if len(fields) > 4 else "").split(";"):
+        words = op.split()
+        if words:
+            ops[words[0]] = [w.strip('"') for w in words[1:]]
+    halfmove = ops.get("hmvc", ["0"])[0]
+    fullmove = ops.get("fmvn", ["1"])[0]
+    return " ".join(fields[:4] + [halfmove, fullmove]), ops
+
+
+def read_epd(path):
+    # streams the records of an epd file, so big suites never sit in memory
+    with open(path) as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield number, line
+
+
+def solve(line, limits, board_class=Board):
+    # runs in a worker: search one epd record and check it against bm / am.
+    # returns (id, played move in san, solved or None if there is nothing to
+    # check, nodes)
+    time_limit, node_limit, max_depth = limits
+    fen, ops = parse_epd(line)
+    api = API(board_class)
+    api.load_fen(fen)
+    g = api.g
+    name = " ".join(ops.get("id", [])) or fen
+
+    engine = AlphaBetaEngine(
+        api, max_depth=max_depth, time_limit=time_limit, node_limit=node_limit
+    )
+    move = engine.get_best_move()
+    if move is None:
+        return name, None, None, engine.nodes
+
+    best = [san_to_move(g.board, g.turn, san) for san in ops.get("bm", [])]
+    avoid = [san_to_move(g.board, g.turn, san) for san in ops.get("am", [])]
+    solved = None
+    if best or avoid:
+        solved = (not best or move in best) and move not in avoid
+    return name, move_to_san(g.board, g.turn, move), solved, engine.nodes
+
+
+def run_suite(
+    path,
+    time_limit=1.0,
+    node_limit=None,
+    max_depth=64,
+    workers=1,
+    board_class=Board,
+    out=sys.stdout,
+):
+    limits = (time_limit, node_limit, max_depth)
+    records = read_epd(path)
+    checked = solved = positions = nodes = 0
+    start = time.perf_counter()
+
+    def report(number, result):
+        nonlocal checked, solved, positions, nodes
+        name, played, ok, searched = result
+        positions += 1
+        nodes += searched
+        if ok is not None:
+            checked += 1
+            solved += ok
+        status = {True: "ok", False: "FAIL", None: "-"}[ok]
+        print(f"{number:>6}  {status:<4}  {played or '(none)':<8}  {name}", file=out)
+
+    if workers <= 1:
+        for number, line in records:
+            report(number, solve(line, limits, board_class))
+    else:
+        # a bounded window of records in flight, the file is read as it goes
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for number, line in records:
+                future = pool.submit(solve, line, limits, board_class)
+                pending[future] = number
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        report(pending.pop(future), future.result())
+            for future in list(pending):
+                report(pending.pop(future), future.result())
+
+    elapsed = time.perf_counter() - start
+    rate = positions / elapsed if elapsed > 0 else 0.0
+    percent = 100 * solved / checked if checked else 0.0
+    print(
+        f"\nsolved {solved}/{checked} ({percent:.1f}%), {positions} positions "
+        f"in {elapsed:.1f}s, {rate:.2f} positions/s, {nodes} nodes",
+        file=out,
+    )
+    return solved, checked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run an epd suite through the engine")
+    parser.add_argument("path", help="epd file, bm / am operations are checked")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds a position")
+    parser.add_argument("--nodes", type=int, help="node limit a position")
+    parser.add_argument("--depth", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--bitboard", action="store_true", help="use BitboardBoard")
+    args = parser.parse_args(argv)
+
+    run_suite(
+        args.path,
+        time_limit=args.time if args.nodes is None else None,
+        node_limit=args.nodes,
+        max_depth=args.depth,
+        workers=args.workers,
+        board_class=BitboardBoard if args.bitboard else Board,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
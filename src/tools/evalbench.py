@@ -0,0 +1,104 @@
+import argparse
+import random
+import sys
+import time
+
+from ..backend.api import API
+from ..backend.board import Board
+from ..backend.bitboard import BitboardBoard
+from ..backend.fen import game_from_fen
+from ..engine.alphabeta import AlphaBetaEngine
+from ..engine.batched import BatchEvaluator, BatchedAlphaBetaEngine
+from ..engine.evaluation import evaluate_full, taper
+from .perft import SUITE
+
+
+def random_positions(count, seed=0, max_plies=80):
+    # boards reached by random playouts from the start position
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        api = API()
+        for _ in range(rng.randrange(max_plies)):
+            moves = api.get_legal_moves()
+            if not moves:
+                break
+            api.make_move(rng.choice(moves))
+        boards.append(api.get_board())
+    return boards
+
+
+def bench_eval(count, seed):
+    matrices = random_positions(count, seed)
+
+    start = time.perf_counter()
+    scalar = [taper(*evaluate_full(m)) for m in matrices]
+    scalar_time = time.perf_counter() - start
+
+    evaluator = BatchEvaluator()
+    start = time.perf_counter()
+    positions = evaluator.batch([[p for row in m for p in row] for m in matrices])
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = evaluator.score(positions)
+    batch_time = time.perf_counter() - start
+
+    same = list(map(int, batched)) == scalar
+    print(f"{count} positions, scores {'match' if same else 'DIFFER'}")
+    print(
+        f"  scalar   {scalar_time * 1000:9.2f} ms  {count / scalar_time:>10.0f} pos/s"
+    )
+    print(
+        f"  batched  {batch_time * 1000:9.2f} ms  {count / batch_time:>10.0f} pos/s"
+        f"  (+{encode_time * 1000:.2f} ms to build the array)"
+    )
+    return same
+
+
+def bench_search(depth, board_class):
+    fens = [entry["fen"] for entry in SUITE[:7]]
+    totals = {}
+    for name, engine_class in [
+        ("scalar", AlphaBetaEngine),
+        ("batched", BatchedAlphaBetaEngine),
+    ]:
+        results = []
+        elapsed = 0.0
+        for fen in fens:
+            api = API(board_class)
+            api.g = game_from_fen(fen, board_class)
+            engine = engine_class(
+                api, max_depth=depth, time_limit=None, quiescence=False
+            )
+            start = time.perf_counter()
+            move = engine.get_best_move()
+            elapsed += time.perf_counter() - start
+            results.append((move, engine.best_score))
+        totals[name] = results
+        print(f"  {name:<8} depth {depth}  {elapsed:8.2f}s")
+    scores_match = [s for _, s in totals["scalar"]] == [
+        s for _, s in totals["batched"]
+    ]
+    print(f"  root scores {'match' if scores_match else 'DIFFER'}")
+    return scores_match
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="batched numpy evaluation against the scalar one"
+    )
+    parser.add_argument("--positions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=3, help="search depth, 0 to skip")
+    parser.add_argument("--bitboard", action="store_true", help="use BitboardBoard")
+    args = parser.parse_args(argv)
+
+    ok = bench_eval(args.positions, args.seed)
+    if args.depth:
+        print("search")
+        ok = bench_search(args.depth, BitboardBoard if args.bitboard else Board) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
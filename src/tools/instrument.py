@@ -0,0 +1,236 @@
+import argparse
+import json
+import sys
+import time
+
+from ..backend import bitboard, board, move_gen
+from ..backend.api import API
+from ..backend.bitboard import BitboardBoard
+from ..backend.fen import STARTING_FEN
+from ..engine import evaluation
+from ..engine.alphabeta import AlphaBetaEngine
+
+# phase -> (owner, attribute) of every function that belongs to it. module
+# functions are also replaced wherever another module imported them by name.
+PHASES = {
+    "movegen": [
+        (move_gen, "getLegalMoves"),
+        (move_gen, "getLegalMovesPacked"),
+        (bitboard, "bb_legal_moves"),
+        (bitboard, "bb_legal_moves_packed"),
+    ],
+    "attack": [
+        (move_gen, "isSquareAttacked"),
+        (move_gen, "getCheckersAndPins"),
+        (bitboard, "bb_attacked"),
+    ],
+    "apply": [
+        (board.Board, "apply_move"),
+        (BitboardBoard, "apply_move"),
+    ],
+    "undo": [
+        (board.Board, "undo_move"),
+        (BitboardBoard, "undo_move"),
+    ],
+    "evaluate": [
+        (evaluation.IncrementalEval, "evaluate"),
+        (evaluation, "evaluate_full"),
+    ],
+}
+
+PACKAGE = __name__.split(".")[0]
+
+
+class Instrumentation:
+    # opt-in counters and timers for the search hot paths. enable() swaps the
+    # functions in PHASES for counting, timing wrappers and disable() puts the
+    # originals back, so when it is off nothing at all runs in their place.
+    #
+    # times are exclusive: a move generation that calls the attack test is
+    # only charged for its own part, the attack test gets the rest.
+
+    def __init__(self):
+        self.enabled = False
+        self.patches = []
+        self.reset()
+
+    def reset(self):
+        self.counts = {phase: 0 for phase in PHASES}
+        self.times = {phase: 0.0 for phase in PHASES}
+        # [phase, time spent in children] of every wrapper on the call stack
+        self.stack = []
+        self.searches = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        for phase, targets in PHASES.items():
+            for owner, name in targets:
+                if isinstance(owner, type) and name not in vars(owner):
+                    continue
+                original = getattr(owner, name)
+                self._replace(owner, name, original, self._wrap(phase, original))
+        self._replace(
+            AlphaBetaEngine,
+            "get_best_move",
+            AlphaBetaEngine.get_best_move,
+            self._wrap_search(AlphaBetaEngine.get_best_move),
+        )
+        self._replace(
+            AlphaBetaEngine,
+            "search_root",
+            AlphaBetaEngine.search_root,
+            self._wrap_iteration(AlphaBetaEngine.search_root),
+        )
+        self.enabled = True
+
+    def disable(self):
+        for owner, name, original in reversed(self.patches):
+            setattr(owner, name, original)
+        self.patches = []
+        self.enabled = False
+
+    def _replace(self, owner, name, original, wrapper):
+        targets = [(owner, name)]
+        if not isinstance(owner, type):
+            # modules that did `from .move_gen import getLegalMoves` hold their
+            # own reference, those are swapped too
+            for module in list(sys.modules.values()):
+                if module is owner or not getattr(module, "__name__", "").startswith(
+                    PACKAGE + "."
+                ):
+                    continue
+                for attr, value in list(vars(module).items()):
+                    if value is original:
+                        targets.append((module, attr))
+        for target, attr in targets:
+            self.patches.append((target, attr, getattr(target, attr)))
+            setattr(target, attr, wrapper)
+
+    def _wrap(self, phase, fn):
+        counts = self.counts
+        times = self.times
+        stack = self.stack
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            # calls within the same phase (getLegalMovesPacked -> getLegalMoves)
+            # are one unit of work
+            if stack and stack[-1][0] == phase:
+                return fn(*args, **kwargs)
+            counts[phase] += 1
+            frame = [phase, 0.0]
+            stack.append(frame)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                total = clock() - start
+                stack.pop()
+                times[phase] += total - frame[1]
+                if stack:
+                    stack[-1][1] += total
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def _wrap_search(self, fn):
+        def get_best_move(engine):
+            counts = dict(self.counts)
+            times = dict(self.times)
+            nodes_by_depth = []
+            engine._instrument_depths = nodes_by_depth
+            start = time.perf_counter()
+            move = fn(engine)
+            elapsed = time.perf_counter() - start
+            self.searches.append(
+                search_report(
+                    engine,
+                    elapsed,
+                    nodes_by_depth,
+                    {k: self.counts[k] - counts[k] for k in counts},
+                    {k: self.times[k] - times[k] for k in times},
+                )
+            )
+            return move
+
+        return get_best_move
+
+    def _wrap_iteration(self, fn):
+        def search_root(engine, depth, moves):
+            before = engine.nodes
+            result = fn(engine, depth, moves)
+            depths = getattr(engine, "_instrument_depths", None)
+            if depths is not None and result[0] is not None:
+                depths.append(engine.nodes - before)
+            return result
+
+        return search_root
+
+    def report(self):
+        return {
+            "counts": dict(self.counts),
+            "times": {k: round(v, 6) for k, v in self.times.items()},
+            "searches": self.searches,
+        }
+
+    def to_json(self, path=None, indent=2):
+        text = json.dumps(self.report(), indent=indent)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        return text
+
+
+def search_report(engine, elapsed, nodes_by_depth, counts, times):
+    # effective branching factor: growth of the tree from one finished depth
+    # to the next, averaged geometrically
+    ebf = None
+    if len(nodes_by_depth) >= 2 and nodes_by_depth[0] > 0:
+        ebf = (nodes_by_depth[-1] / nodes_by_depth[0]) ** (
+            1 / (len(nodes_by_depth) - 1)
+        )
+    cutoffs = engine.cutoffs
+    return {
+        "nodes": engine.nodes,
+        "time": round(elapsed, 6),
+        "nps": int(engine.nodes / elapsed) if elapsed > 0 else 0,
+        "depth": engine.completed_depth,
+        "nodes_by_depth": nodes_by_depth,
+        "branching_factor": round(ebf, 3) if ebf is not None else None,
+        "cutoffs": cutoffs,
+        "first_move_cutoff_rate": (
+            round(engine.first_cutoffs / cutoffs, 4) if cutoffs else None
+        ),
+        "counts": counts,
+        "times": {k: round(v, 6) for k, v in times.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="instrumented alpha-beta search")
+    parser.add_argument("--fen", default=STARTING_FEN)
+    parser.add_argument("--time", type=float, default=1.0)
+    parser.add_argument("--depth", type=int, default=64)
+    parser.add_argument("--bitboard", action="store_true", help="use BitboardBoard")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    api = API(BitboardBoard if args.bitboard else board.Board)
+    api.load_fen(args.fen)
+    engine = AlphaBetaEngine(api, max_depth=args.depth, time_limit=args.time)
+    with Instrumentation() as inst:
+        engine.get_best_move()
+    print(inst.to_json(args.json))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+class Connection:
+    # a keep-alive http/1.1 connection speaking just enough of the protocol
+    # for the game server: json in, json out, content-length framed
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        body = b"" if payload is None else json.dumps(payload).encode()
+        head = (
+            f"{method} {path} HTTP/1.1\r\nhost: {self.host}\r\n"
+            f"content-type: application/json\r\ncontent-length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self.reader.readexactly(length) if length else b""
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+class Stats:
+    def __init__(self):
+        # endpoint -> latencies in seconds
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, name, seconds, status):
+        self.latencies.setdefault(name, []).append(seconds)
+        if status >= 400:
+            self.errors[status] = self.errors.get(status, 0) + 1
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def client(url, stats, rng, games, plies, engine_rate, engine_time):
+    # plays `games` games: random moves, with an engine reply now and then
+    parts = urlsplit(url)
+    conn = Connection(parts.hostname, parts.port or 80)
+
+    async def call(name, method, path, payload=None):
+        start = time.perf_counter()
+        status, body = await conn.request(method, path, payload)
+        stats.add(name, time.perf_counter() - start, status)
+        return status, body
+
+    try:
+        for _ in range(games):
+            status, game = await call("new", "POST", "/games")
+            if status != 201:
+                continue
+            path = f"/games/{game['id']}"
+            for _ in range(plies):
+                if rng.random() < engine_rate:
+                    status, state = await call(
+                        "engine", "POST", path + "/engine", {"time": engine_time}
+                    )
+                else:
+                    status, legal = await call("moves", "GET", path + "/moves")
+                    if status != 200 or not legal["moves"]:
+                        break
+                    move = rng.choice(legal["moves"])
+                    status, state = await call(
+                        "move", "POST", path + "/move", {"move": move}
+                    )
+                if status != 200 or state["over"]:
+                    break
+            await call("delete", "DELETE", path)
+    finally:
+        await conn.close()
+
+
+async def run(url, clients, games, plies, engine_rate, engine_time, seed):
+    stats = Stats()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(
+                url,
+                stats,
+                random.Random(rng.getrandbits(32)),
+                games,
+                plies,
+                engine_rate,
+                engine_time,
+            )
+            for _ in range(clients)
+        )
+    )
+    return stats, time.perf_counter() - start
+
+
+def report(stats, elapsed, out=sys.stdout):
+    total = sum(len(v) for v in stats.latencies.values())
+    print(
+        f"{total} requests in {elapsed:.2f}s, {total / elapsed:.1f} req/s, "
+        f"errors {stats.errors or 'none'}",
+        file=out,
+    )
+    print(
+        f"  {'endpoint':<8} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        file=out,
+    )
+    everything = []
+    for name, values in sorted(stats.latencies.items()):
+        everything += values
+        print(
+            f"  {name:<8} {len(values):>7} {percentile(values, 50) * 1000:>9.2f} "
+            f"{percentile(values, 99) * 1000:>9.2f} {max(values) * 1000:>9.2f}",
+            file=out,
+        )
+    if everything:
+        print(
+            f"  {'all':<8} {len(everything):>7} "
+            f"{percentile(everything, 50) * 1000:>9.2f} "
+            f"{percentile(everything, 99) * 1000:>9.2f} "
+            f"{max(everything) * 1000:>9.2f}",
+            file=out,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="load generator for src.server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent clients")
+    parser.add_argument("--games", type=int, default=2, help="games per client")
+    parser.add_argument("--plies", type=int, default=40, help="plies per game")
+    parser.add_argument(
+        "--engine-rate", type=float, default=0.1, help="share of engine moves"
+    )
+    parser.add_argument("--engine-time", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stats, elapsed = asyncio.run(
+        run(
+            args.url,
+            args.clients,
+            args.games,
+            args.plies,
+            args.engine_rate,
+            args.engine_time,
+            args.seed,
+        )
+    )
+    report(stats, elapsed)
+    return 0 if not stats.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import argparse
+import re
+import sys
+
+from ..backend.bitboard import BitboardBoard
+from ..backend.game import Game
+from ..backend.san import san_to_move
+from ..engine.book import board_key, encode_move, polyglot_key, write_book
+
+HEADER = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+# move numbers, nags and results, none of which are moves
+NOT_MOVES = re.compile(r"^(\d+\.+|\$\d+|1-0|0-1|1/2-1/2|\*)$")
+
+# book weight of a move by the result for the side that played it
+RESULT_POINTS = {"win": 2, "draw": 1, "loss": 0}
+
+
+def movetext_tokens(text):
+    # san moves of pgn movetext, without comments, variations and numbering
+    text = re.sub(r";[^\n]*", " ", text)
+    text = re.sub(r"\{[^}]*\}", " ", text)
+    # variations nest, peel them from the inside out
+    while True:
+        stripped = re.sub(r"\([^()]*\)", " ", text)
+        if stripped == text:
+            break
+        text = stripped
+    # "1.e4" and "1...e5" glue the number to the move
+    text = re.sub(r"(\d+\.+)", r" \1 ", text)
+    return [t for t in text.split() if not NOT_MOVES.match(t)]
+
+
+def read_pgn(path):
+    # streams (headers, san moves) of every game in a pgn file
+    headers = {}
+    movetext = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = HEADER.match(line)
+            if match:
+                if movetext:
+                    yield headers, movetext_tokens(" ".join(movetext))
+                    headers, movetext = {}, []
+                headers[match.group(1)] = match.group(2)
+            elif line.strip():
+                movetext.append(line)
+    if headers or movetext:
+        yield headers, movetext_tokens(" ".join(movetext))
+
+
+def add_game(weights, counts, headers, sans, max_plies, key_fn=polyglot_key):
+    # credits the first max_plies moves of one game, returns how many were used
+    game = Game(BitboardBoard)
+    if "FEN" in headers:
+        try:
+            game.load_fen(headers["FEN"])
+        except ValueError:
+            return 0
+    result = headers.get("Result", "*")
+    for ply, san in enumerate(sans[:max_plies]):
+        move = san_to_move(game.board, game.turn, san)
+        if move is None:
+            # unreadable, ambiguous or an underpromotion: the rest of the game
+            # can't be followed
+            return ply
+        if result == "1/2-1/2":
+            outcome = "draw"
+        elif result in ("1-0", "0-1"):
+            won = (result == "1-0") == (game.turn == "white")
+            outcome = "win" if won else "loss"
+        else:
+            outcome = "draw"
+        entry = (key_fn(game), encode_move(game.board, move))
+        weights[entry] = weights.get(entry, 0) + RESULT_POINTS[outcome]
+        counts[entry] = counts.get(entry, 0) + 1
+        game.make_move(move)
+    return min(len(sans), max_plies)
+
+
+def build_book(pgn_paths, out, max_plies=20, min_games=1, key_fn=polyglot_key):
+    weights = {}
+    counts = {}
+    games = plies = 0
+    for path in pgn_paths:
+        for headers, sans in read_pgn(path):
+            games += 1
+            plies += add_game(weights, counts, headers, sans, max_plies, key_fn)
+    # moves seen too rarely say more about one game than about the opening
+    kept = {e: w for e, w in weights.items() if counts[e] >= min_games}
+    entries = write_book(out, kept)
+    return games, plies, entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="build a polyglot book")
+    parser.add_argument("pgn", nargs="+", help="pgn files to read")
+    parser.add_argument("-o", "--out", default="book.bin")
+    parser.add_argument("--plies", type=int, default=20, help="plies per game")
+    parser.add_argument(
+        "--min-games", type=int, default=1, help="games a move needs to be kept"
+    )
+    parser.add_argument(
+        "--zobrist",
+        action="store_true",
+        help="key positions with our own zobrist hash instead of polyglot's",
+    )
+    args = parser.parse_args(argv)
+
+    games, plies, entries = build_book(
+        args.pgn,
+        args.out,
+        max_plies=args.plies,
+        min_games=args.min_games,
+        key_fn=board_key if args.zobrist else polyglot_key,
+    )
+    print(f"{games} games, {plies} plies, {entries} entries written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
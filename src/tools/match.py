@@ -0,0 +1,341 @@
+import argparse
+import ast
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from ..backend.api import API
+from ..backend.board import Board
+from ..backend.bitboard import BitboardBoard
+from ..backend.fen import STARTING_FEN, game_from_fen
+from ..backend.san import move_to_san
+from ..engine.alphabeta import AlphaBetaEngine
+from ..engine.dumbo import DumboEngine
+from ..engine.minmax import MinimaxEngine
+from ..engine.parallel import ParallelEngine
+from ..utils import uci_to_coords
+
+ENGINES = {
+    "alphabeta": AlphaBetaEngine,
+    "minimax": MinimaxEngine,
+    "parallel": ParallelEngine,
+    "random": DumboEngine,
+}
+
+# short, balanced openings from the start position, every one is played twice
+# with colours swapped so neither side gets the better half of the book
+OPENINGS = [
+    "e2e4 e7e5 g1f3 b8c6 f1b5",
+    "e2e4 e7e5 g1f3 b8c6 f1c4",
+    "e2e4 c7c5 g1f3 d7d6",
+    "e2e4 c7c5 b1c3 b8c6",
+    "e2e4 e7e6 d2d4 d7d5",
+    "e2e4 c7c6 d2d4 d7d5",
+    "d2d4 d7d5 c2c4 e7e6",
+    "d2d4 d7d5 c2c4 c7c6",
+    "d2d4 g8f6 c2c4 e7e6 b1c3 f8b4",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 f8g7",
+    "c2c4 e7e5 b1c3 g8f6",
+    "g1f3 d7d5 g2g3 g8f6",
+]
+
+
+def parse_engine(spec):
+    # "alphabeta:time_limit=0.1,tt_mb=4" -> ("alphabeta", {...})
+    name, _, params = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r}, one of {', '.join(ENGINES)}")
+    kwargs = {}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        kwargs[key] = ast.literal_eval(value)
+    return name, kwargs
+
+
+def engine_label(engine):
+    # ("alphabeta", {"time_limit": 0.1}) -> "alphabeta:time_limit=0.1", the spec
+    # parse_engine reads back
+    name, kwargs = engine
+    params = ",".join(f"{key}={value!r}" for key, value in kwargs.items())
+    return f"{name}:{params}" if params else name
+
+
+def load_openings(path):
+    # one opening per line: a fen, or a list of uci moves from the start
+    openings = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                openings.append(line)
+    return openings
+
+
+def opening_start(opening, board_class):
+    # (game, opening moves) for a fen or a move list from the start position
+    if "/" in opening:
+        return game_from_fen(opening, board_class), []
+    game = game_from_fen(STARTING_FEN, board_class)
+    return game, [uci_to_coords(text) for text in opening.split()]
+
+
+def play_game(white, black, opening, max_plies=300, board_class=Board):
+    # plays one game, runs in a worker process. returns
+    # (result, termination, san moves, fen of the start position or None)
+    api = API(board_class)
+    api.g, book = opening_start(opening, board_class)
+    fen = opening if "/" in opening else None
+    engines = {
+        "white": ENGINES[white[0]](api, **white[1]),
+        "black": ENGINES[black[0]](api, **black[1]),
+    }
+
+    sans = []
+    seen = {}
+    termination = "max plies"
+    result = "1/2-1/2"
+    while len(sans) < max_plies:
+        g = api.g
+        turn = g.turn
+        legal = g.legal_moves()
+        if book:
+            move = book.pop(0)
+        else:
+            move = engines[turn].get_best_move()
+        if not g.is_legal(move):
+            termination = f"illegal move by {turn}"
+            result = "0-1" if turn == "white" else "1-0"
+            break
+
+        sans.append(move_to_san(g.board, turn, move, legal))
+        api.make_move(move)
+
+        if g.game_over:
+            if g.result.startswith("checkmate"):
+                result = "1-0" if g.result == "checkmate_white" else "0-1"
+            termination = g.result
+            break
+        key = api.get_hash()
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] >= 3:
+            termination = "threefold repetition"
+            break
+
+    for engine in engines.values():
+        if hasattr(engine, "close"):
+            engine.close()
+    return result, termination, sans, fen
+
+
+def pgn_text(headers, sans, result):
+    lines = [f'[{key} "{value}"]' for key, value in headers.items()]
+    lines.append("")
+    words = []
+    for i, san in enumerate(sans):
+        if i % 2 == 0:
+            words.append(f"{i // 2 + 1}.")
+        words.append(san)
+    words.append(result)
+
+    # movetext wrapped at 80 columns
+    line = ""
+    for word in words:
+        if line and len(line) + 1 + len(word) > 80:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    return "\n".join(lines) + "\n\n"
+
+
+def score_to_elo(score):
+    score = min(max(score, 1e-9), 1 - 1e-9)
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_estimate(wins, draws, losses):
+    # elo difference and its 95% error margin from the match score
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0, float("inf")
+    score = (wins + draws / 2) / n
+    if score <= 0 or score >= 1:
+        return (float("inf") if score >= 1 else float("-inf")), float("inf")
+    var = (
+        wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score**2
+    ) / n
+    stderr = math.sqrt(var / n)
+    low = score_to_elo(score - 1.96 * stderr)
+    high = score_to_elo(score + 1.96 * stderr)
+    return score_to_elo(score), (high - low) / 2
+
+
+# half a game of every outcome added before the sprt estimates its variance,
+# so a run of all wins, all draws or all losses still moves the llr
+SPRT_PSEUDO_COUNT = 0.5
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    # log likelihood ratio of H1 (elo1) against H0 (elo0), normal approximation
+    # of the trinomial as in the usual gsprt
+    if wins + draws + losses == 0:
+        return 0.0
+    wins += SPRT_PSEUDO_COUNT
+    draws += SPRT_PSEUDO_COUNT
+    losses += SPRT_PSEUDO_COUNT
+    n = wins + draws + losses
+    score = (wins + draws / 2) / n
+    var = (
+        wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score**2
+    ) / n
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return n * (s1 - s0) * (2 * score - s0 - s1) / (2 * var)
+
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def run_match(
+    engine1,
+    engine2,
+    games=100,
+    workers=1,
+    openings=OPENINGS,
+    max_plies=300,
+    board_class=Board,
+    pgn_path=None,
+    sprt=None,
+    out=sys.stdout,
+):
+    # plays engine1 against engine2, results are from engine1's side.
+    # sprt=(elo0, elo1, alpha, beta) stops the match once a hypothesis wins.
+    wins = draws = losses = 0
+    verdict = None
+    names = engine_label(engine1), engine_label(engine2)
+    pgn = open(pgn_path, "a") if pgn_path else None
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i in range(games):
+            # every opening twice, engine1 takes white in the even games
+            opening = openings[(i // 2) % len(openings)]
+            engine1_white = i % 2 == 0
+            white, black = (engine1, engine2) if engine1_white else (engine2, engine1)
+            future = pool.submit(
+                play_game, white, black, opening, max_plies, board_class
+            )
+            futures[future] = (i, engine1_white)
+
+        for future in as_completed(futures):
+            i, engine1_white = futures[future]
+            result, termination, sans, fen = future.result()
+            if result == "1/2-1/2":
+                draws += 1
+            elif (result == "1-0") == engine1_white:
+                wins += 1
+            else:
+                losses += 1
+
+            if pgn is not None:
+                headers = {
+                    "Event": "touchgrass match",
+                    "Site": "local",
+                    "Date": date.today().strftime("%Y.%m.%d"),
+                    "Round": str(i + 1),
+                    "White": names[0] if engine1_white else names[1],
+                    "Black": names[1] if engine1_white else names[0],
+                    "Result": result,
+                    "Termination": termination,
+                }
+                if fen is not None:
+                    headers["SetUp"] = "1"
+                    headers["FEN"] = fen
+                pgn.write(pgn_text(headers, sans, result))
+                pgn.flush()
+
+            played = wins + draws + losses
+            elo, margin = elo_estimate(wins, draws, losses)
+            line = (
+                f"game {played:>4}/{games}  +{wins} ={draws} -{losses}  "
+                f"elo {elo:+.1f} +/- {margin:.1f}"
+            )
+            if sprt is not None:
+                elo0, elo1, alpha, beta = sprt
+                llr = sprt_llr(wins, draws, losses, elo0, elo1)
+                lower, upper = sprt_bounds(alpha, beta)
+                line += f"  llr {llr:.2f} [{lower:.2f}, {upper:.2f}]"
+                if llr >= upper:
+                    verdict = "H1"
+                elif llr <= lower:
+                    verdict = "H0"
+            print(line, file=out, flush=True)
+            if verdict is not None:
+                for f in futures:
+                    f.cancel()
+                break
+
+    elapsed = time.perf_counter() - start
+    if pgn is not None:
+        pgn.close()
+    played = wins + draws + losses
+    per_hour = played / elapsed * 3600 if elapsed > 0 else 0.0
+    print(
+        f"\n{played} games in {elapsed:.1f}s, {per_hour:.0f} games/hour"
+        + (f", sprt accepted {verdict}" if verdict else ""),
+        file=out,
+    )
+    return {
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "elo": elo_estimate(wins, draws, losses),
+        "sprt": verdict,
+        "games_per_hour": per_hour,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="play touchgrass engines")
+    parser.add_argument("engine1", help='e.g. "alphabeta:time_limit=0.1"')
+    parser.add_argument("engine2", help='e.g. "alphabeta:time_limit=0.1,tt_mb=1"')
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--openings", help="file with one fen or uci move list a line")
+    parser.add_argument("--max-plies", type=int, default=300)
+    parser.add_argument("--pgn", help="append the games to this file")
+    parser.add_argument(
+        "--sprt",
+        nargs=2,
+        type=float,
+        metavar=("ELO0", "ELO1"),
+        help="stop once engine1 is shown to be elo0 or elo1 stronger",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--bitboard", action="store_true", help="use BitboardBoard")
+    args = parser.parse_args(argv)
+
+    openings = load_openings(args.openings) if args.openings else OPENINGS
+    sprt = (*args.sprt, args.alpha, args.beta) if args.sprt else None
+    run_match(
+        parse_engine(args.engine1),
+        parse_engine(args.engine2),
+        games=args.games,
+        workers=args.workers,
+        openings=openings,
+        max_plies=args.max_plies,
+        board_class=BitboardBoard if args.bitboard else Board,
+        pgn_path=args.pgn,
+        sprt=sprt,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import argparse
+import sys
+import time
+
+from ..backend.board import Board
+from ..backend.bitboard import BitboardBoard
+from ..backend.fen import STARTING_FEN, game_from_fen
+from ..backend.move_gen import getLegalMoves
+from ..utils import coords_to_uci
+
+# reference positions from https://www.chessprogramming.org/Perft_Results and
+# the usual collection of movegen edge cases. counts are for depth 1, 2, 3...
+# promotions in this project always make a queen, so the standard counts only
+# hold where no promotion happens. where one does, the list has the queen-only
+# count instead, cross-checked against the standard numbers by a generator
+# that also tried the underpromotions.
+SUITE = [
+    {
+        "name": "start position",
+        "fen": STARTING_FEN,
+        "counts": [20, 400, 8902, 197281, 4865609],
+    },
+    {
+        "name": "kiwipete (castling, en passant, pins)",
+        "fen": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -",
+        "counts": [48, 2039, 97862],
+    },
+    {
+        "name": "position 3 (en passant, discovered checks)",
+        "fen": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -",
+        "counts": [14, 191, 2812, 43238, 674624],
+    },
+    {
+        "name": "position 4 (promotions, queen only)",
+        "fen": "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        "counts": [6, 228, 8087],
+    },
+    {
+        "name": "position 4 mirrored (promotions, queen only)",
+        "fen": "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+        "counts": [6, 228, 8087],
+    },
+    {
+        "name": "position 5 (promotion by capture, queen only)",
+        "fen": "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "counts": [41, 1373, 54007],
+    },
+    {
+        "name": "position 6",
+        "fen": "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        "counts": [46, 2079, 89890],
+    },
+    {
+        "name": "illegal en passant, pinned pawn",
+        "fen": "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1",
+        "counts": [18, 92, 1670, 10138, 185429, 1132035],
+    },
+    {
+        "name": "illegal en passant, bishop pin",
+        "fen": "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+        "counts": [13, 102, 1266, 10276, 135655, 1013750],
+    },
+    {
+        "name": "en passant capture gives check",
+        "fen": "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+        "counts": [15, 126, 1928, 13931, 206136, 1438912],
+    },
+    {
+        "name": "short castling gives check",
+        "fen": "5k2/8/8/8/8/8/8/4K2R w K - 0 1",
+        "counts": [15, 66, 1198, 6399, 120330, 661072],
+    },
+    {
+        "name": "long castling gives check",
+        "fen": "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1",
+        "counts": [16, 71, 1286, 7418, 141077, 803711],
+    },
+    {
+        "name": "castling rights",
+        "fen": "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1",
+        "counts": [26, 1141, 27826, 1274206],
+    },
+    {
+        "name": "castling prevented",
+        "fen": "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1",
+        "counts": [44, 1494, 50509, 1720476],
+    },
+    {
+        "name": "promote out of check (queen only)",
+        "fen": "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+        "counts": [5, 75, 694, 9674, 128641, 1783549],
+    },
+    {
+        "name": "discovered check",
+        "fen": "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1",
+        "counts": [29, 165, 5160, 30674, 963213],
+    },
+    {
+        "name": "promote to give check (queen only)",
+        "fen": "4k3/1P6/8/8/8/8/K7/8 w - - 0 1",
+        "counts": [6, 28, 248, 1379, 18382, 96431],
+    },
+    {
+        "name": "promotion near the king (queen only)",
+        "fen": "8/P1k5/K7/8/8/8/8/8 w - - 0 1",
+        "counts": [3, 13, 111, 553, 7461, 35337],
+    },
+    {
+        "name": "self stalemate",
+        "fen": "K1k5/8/P7/8/8/8/8/8 w - - 0 1",
+        "counts": [2, 6, 13, 63, 331, 1924],
+    },
+    {
+        "name": "stalemate and checkmate",
+        "fen": "8/k1P5/8/1K6/8/8/8/8 w - - 0 1",
+        "counts": [7, 19, 129, 498, 4217, 18519, 188160],
+    },
+    {
+        "name": "double check",
+        "fen": "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1",
+        "counts": [37, 183, 6559, 23527],
+    },
+]
+
+
+def count_nodes(board, color, depth):
+    moves = getLegalMoves(board, color)
+    if depth == 1:
+        return len(moves)
+
+    other = "black" if color == "white" else "white"
+    nodes = 0
+    for move in moves:
+        record = board.apply_move(move)
+        nodes += count_nodes(board, other, depth - 1)
+        board.undo_move(move, record)
+    return nodes
+
+
+def perft(depth, fen=STARTING_FEN, board_class=Board):
+    if depth == 0:
+        return 1
+    game = game_from_fen(fen, board_class)
+    return count_nodes(game.board, game.turn, depth)
+
+
+def divide(depth, fen=STARTING_FEN, board_class=Board):
+    # node count below every root move, the usual way to bisect a movegen bug
+    game = game_from_fen(fen, board_class)
+    board = game.board
+    other = "black" if game.turn == "white" else "white"
+
+    result = {}
+    for move in getLegalMoves(board, game.turn):
+        if depth <= 1:
+            result[coords_to_uci(move)] = 1
+            continue
+        record = board.apply_move(move)
+        result[coords_to_uci(move)] = count_nodes(board, other, depth - 1)
+        board.undo_move(move, record)
+    return result
+
+
+def _nps(nodes, elapsed):
+    return int(nodes / elapsed) if elapsed > 0 else 0
+
+
+def run_depths(depth, fen, board_class):
+    for d in range(1, depth + 1):
+        start = time.perf_counter()
+        nodes = perft(d, fen, board_class)
+        elapsed = time.perf_counter() - start
+        print(
+            f"depth {d:<2}  nodes {nodes:>10}  "
+            f"time {elapsed:8.3f}s  nps {_nps(nodes, elapsed):>8}"
+        )
+
+
+def run_divide(depth, fen, board_class):
+    start = time.perf_counter()
+    counts = divide(depth, fen, board_class)
+    elapsed = time.perf_counter() - start
+    for move, nodes in counts.items():
+        print(f"{move}: {nodes}")
+    total = sum(counts.values())
+    print(f"\nmoves {len(counts)}  nodes {total}  nps {_nps(total, elapsed)}")
+
+
+def run_suite(board_class, max_nodes):
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+    for entry in SUITE:
+        print(entry["name"])
+        for d, expected in enumerate(entry["counts"], start=1):
+            if expected > max_nodes:
+                break
+            start = time.perf_counter()
+            nodes = perft(d, entry["fen"], board_class)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            status = "ok" if nodes == expected else f"FAIL (expected {expected})"
+            if nodes != expected:
+                failures += 1
+            print(
+                f"  depth {d:<2}  nodes {nodes:>10}  "
+                f"nps {_nps(nodes, elapsed):>8}  {status}"
+            )
+    print(
+        f"\n{total_nodes} nodes in {total_time:.2f}s, "
+        f"{_nps(total_nodes, total_time)} nps, {failures} failed"
+    )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="perft for touchgrass move generation")
+    parser.add_argument("depth", type=int, nargs="?", default=3)
+    parser.add_argument("--fen", default=STARTING_FEN)
+    parser.add_argument("--divide", action="store_true", help="count per root move")
+    parser.add_argument("--suite", action="store_true", help="run the reference suite")
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=200000,
+        help="skip suite depths with more nodes than this",
+    )
+    parser.add_argument("--bitboard", action="store_true", help="use BitboardBoard")
+    args = parser.parse_args(argv)
+
+    board_class = BitboardBoard if args.bitboard else Board
+    if args.suite:
+        return 1 if run_suite(board_class, args.max_nodes) else 0
+    if args.divide:
+        run_divide(args.depth, args.fen, board_class)
+    else:
+        run_depths(args.depth, args.fen, board_class)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
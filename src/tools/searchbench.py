@@ -0,0 +1,77 @@
+import argparse
+import sys
+import time
+
+from ..backend.api import API
+from ..backend.board import Board
+from ..backend.bitboard import BitboardBoard
+from ..backend.moves import pack
+from ..engine.alphabeta import AlphaBetaEngine
+from ..utils import packed_to_uci
+from .perft import SUITE
+
+# middlegame and endgame positions on top of the perft suite, the last two are
+# the king and pawn endings where null move pruning has to hold back
+POSITIONS = [entry["fen"] for entry in SUITE[:6]] + [
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 9",
+    "r2q1rk1/1b2bppp/p2ppn2/1p6/3NP3/1BN5/PPP2PPP/R2Q1RK1 w - - 0 12",
+    "2r3k1/pp3pp1/4p2p/3n4/3P4/P4N1P/1P3PP1/2R3K1 w - - 0 24",
+    "8/8/1p2k3/p1p1p3/P1P1P3/1P1K4/8/8 w - - 0 40",
+    "8/5k2/8/3pP3/3K4/8/8/8 w - d6 0 1",
+]
+
+CONFIGS = {
+    "full": dict(null_move=False, lmr=False),
+    "null": dict(null_move=True, lmr=False),
+    "lmr": dict(null_move=False, lmr=True),
+    "both": dict(null_move=True, lmr=True),
+}
+
+
+def run(config, depth, board_class, positions=POSITIONS):
+    # (nodes, seconds, best moves) of a fixed depth search of every position
+    nodes = 0
+    elapsed = 0.0
+    moves = []
+    for fen in positions:
+        api = API(board_class)
+        api.load_fen(fen)
+        engine = AlphaBetaEngine(api, max_depth=depth, time_limit=None, **config)
+        start = time.perf_counter()
+        move = engine.get_best_move()
+        elapsed += time.perf_counter() - start
+        nodes += engine.nodes
+        moves.append(None if move is None else packed_to_uci(pack(move)))
+    return nodes, elapsed, moves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="node counts of fixed depth searches with and without pruning"
+    )
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument(
+        "--configs", default=",".join(CONFIGS), help="any of " + ", ".join(CONFIGS)
+    )
+    parser.add_argument("--bitboard", action="store_true", help="use BitboardBoard")
+    args = parser.parse_args(argv)
+
+    board_class = BitboardBoard if args.bitboard else Board
+    baseline = None
+    print(f"{len(POSITIONS)} positions, depth {args.depth}")
+    for name in args.configs.split(","):
+        nodes, elapsed, moves = run(CONFIGS[name], args.depth, board_class)
+        if baseline is None:
+            baseline = nodes, moves
+        ratio = nodes / baseline[0] if baseline[0] else 0.0
+        same = sum(a == b for a, b in zip(moves, baseline[1]))
+        print(
+            f"  {name:<6} {nodes:>10} nodes  {ratio:6.1%}  {elapsed:8.2f}s  "
+            f"{nodes / elapsed if elapsed else 0:>8.0f} nps  "
+            f"{same}/{len(moves)} same moves"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import sys
+import threading
+import time
+
+from .backend.api import API
+from .backend.bitboard import BitboardBoard
+from .backend.board import WPAWN
+from .backend.fen import STARTING_FEN, game_from_fen
+from .backend.moves import PROMOTION
+from .engine.alphabeta import AlphaBetaEngine, MATE, MATE_BOUND
+from .engine.book import OpeningBook
+from .engine.tt import TranspositionTable
+from .utils import coords_to_uci, packed_to_uci, uci_to_coords
+
+NAME = "touchgrass"
+AUTHOR = "the touchgrass authors"
+
+# go arguments that take a number
+GO_NUMBERS = ("wtime", "btime", "winc", "binc", "movestogo", "depth", "nodes")
+GO_NUMBERS += ("movetime",)
+
+# time kept back on every move for the gui, the pipe and python's start-up
+MOVE_OVERHEAD = 0.05
+
+
+def move_to_uci(board, move):
+    # promotions always make a queen, uci wants that spelled out
+    (fx, fy), (tx, ty) = move
+    text = coords_to_uci(move)
+    if abs(board.board[fx][fy]) == WPAWN and tx in (0, 7):
+        text += "q"
+    return text
+
+
+def parse_move(text):
+    # coordinates of a uci move. promotions always make a queen here, so any
+    # other fifth character is refused rather than quietly dropped
+    if (
+        len(text) not in (4, 5)
+        or text[0] not in "abcdefgh"
+        or text[2] not in "abcdefgh"
+        or text[1] not in "12345678"
+        or text[3] not in "12345678"
+        or text[4:] not in ("", "q")
+    ):
+        raise ValueError(f"invalid move {text}")
+    return uci_to_coords(text[:4])
+
+
+def packed_to_uci_text(move):
+    return packed_to_uci(move) + ("q" if move & PROMOTION else "")
+
+
+def score_to_uci(score):
+    if abs(score) < MATE_BOUND:
+        return f"cp {score}"
+    # plies to mate, turned into moves
+    plies = MATE - abs(score)
+    moves = (plies + 1) // 2
+    return f"mate {moves if score > 0 else -moves}"
+
+
+def time_budget(args, turn):
+    # seconds to think from the go arguments, None to search until stopped
+    if "movetime" in args:
+        return max(0.0, args["movetime"] / 1000 - MOVE_OVERHEAD)
+    left = args.get("wtime" if turn == "white" else "btime")
+    if left is None:
+        return None
+    inc = args.get("winc" if turn == "white" else "binc", 0)
+    moves_to_go = max(1, args.get("movestogo", 30))
+    budget = left / moves_to_go + inc * 0.75
+    # never plan to use more than half of what is left
+    return max(0.0, min(budget, left / 2) / 1000 - MOVE_OVERHEAD)
+
+
+class UCI:
+    # reads commands on the main thread and searches on a background one, so
+    # stop and ponderhit get through while the engine is thinking
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.out_lock = threading.Lock()
+        self.api = API(BitboardBoard)
+        self.engine = AlphaBetaEngine(self.api, time_limit=None)
+        self.engine.on_iteration = self.send_info
+        self.thread = None
+        self.search_start = 0.0
+        # infinite or ponder search, bestmove waits for stop or ponderhit
+        self.waiting = False
+        self.ponder_budget = None
+        self.released = threading.Event()
+
+    def send(self, line):
+        with self.out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def send_info(self, depth, move, score):
+        elapsed = time.perf_counter() - self.search_start
+        nodes = self.engine.nodes
+        nps = int(nodes / elapsed) if elapsed > 0 else 0
+        pv = self.engine.principal_variation(depth) or [move]
+        self.send(
+            f"info depth {depth} score {score_to_uci(score)} nodes {nodes} "
+            f"nps {nps} time {int(elapsed * 1000)} "
+            f"pv {' '.join(packed_to_uci_text(m) for m in pv)}"
+        )
+
+    def set_position(self, tokens):
+        if not tokens:
+            return
+        if tokens[0] == "startpos":
+            fen, rest = STARTING_FEN, tokens[1:]
+        elif tokens[0] == "fen":
+            end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            fen, rest = " ".join(tokens[1:end]), tokens[end:]
+        else:
+            return
+        try:
+            self.api.g = game_from_fen(fen, BitboardBoard)
+        except (ValueError, IndexError) as e:
+            self.send(f"info string {e}")
+            return
+        if rest and rest[0] == "moves":
+            for text in rest[1:]:
+                try:
+                    move = parse_move(text)
+                except ValueError as e:
+                    self.send(f"info string {e}")
+                    return
+                if not self.api.is_legal(move):
+                    self.send(f"info string illegal move {text}")
+                    return
+                self.api.make_move(move)
+
+    def go(self, tokens):
+        self.stop()
+        args = {}
+        for i, token in enumerate(tokens):
+            if token in GO_NUMBERS and i + 1 < len(tokens):
+                try:
+                    args[token] = int(tokens[i + 1])
+                except ValueError:
+                    self.send(f"info string invalid {token} {tokens[i + 1]}")
+
+        engine = self.engine
+        engine.max_depth = args.get("depth", 64)
+        engine.node_limit = args.get("nodes")
+        budget = time_budget(args, self.api.g.turn)
+
+        pondering = "ponder" in tokens
+        self.waiting = pondering or "infinite" in tokens
+        self.ponder_budget = budget if pondering else None
+        # a ponder search runs without a clock until ponderhit starts one
+        engine.time_limit = None if self.waiting else budget
+        self.released.clear()
+        # armed here rather than on the search thread, so a stop or ponderhit
+        # sent before the thread gets going isn't undone by it
+        engine.start_clock()
+
+        self.search_start = time.perf_counter()
+        self.thread = threading.Thread(target=self.search, daemon=True)
+        self.thread.start()
+
+    def search(self):
+        move = self.engine.get_best_move()
+        if self.waiting:
+            self.released.wait()
+        if move is None:
+            self.send("bestmove 0000")
+        else:
+            self.send(f"bestmove {move_to_uci(self.api.g.board, move)}")
+
+    def ponderhit(self):
+        self.waiting = False
+        if self.ponder_budget is not None:
+            self.engine.deadline = time.perf_counter() + self.ponder_budget
+        self.released.set()
+
+    def stop(self):
+        if self.thread is not None:
+            self.engine.stop()
+            self.released.set()
+            self.thread.join()
+            self.thread = None
+
+    def set_option(self, tokens):
+        # setoption name Hash value 64
+        if "name" in tokens and "value" in tokens:
+            name = " ".join(tokens[tokens.index("name") + 1 : tokens.index("value")])
+            value = " ".join(tokens[tokens.index("value") + 1 :])
+            if name.lower() == "hash":
+                try:
+                    size = int(value)
+                except ValueError:
+                    self.send(f"info string invalid Hash value {value}")
+                    return
+                self.engine.tt = TranspositionTable(max(1, size))
+            elif name.lower() == "bookfile":
+                if self.engine.book is not None:
+                    self.engine.book.close()
+                self.engine.book = None
+                if value and value != "<empty>":
+                    try:
+                        self.engine.book = OpeningBook(value)
+                    except OSError as e:
+                        self.send(f"info string cannot open book: {e}")
+
+    def handle(self, line):
+        # returns False once the gui asks us to quit
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, rest = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {NAME}")
+            self.send(f"id author {AUTHOR}")
+            self.send(
+                f"option name Hash type spin default {self.engine.tt.size_mb} "
+                "min 1 max 1024"
+            )
+            self.send("option name Ponder type check default false")
+            self.send("option name BookFile type string default <empty>")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.engine.tt.clear()
+        elif command == "setoption":
+            self.set_option(rest)
+        elif command == "position":
+            self.stop()
+            self.set_position(rest)
+        elif command == "go":
+            self.go(rest)
+        elif command == "stop":
+            self.stop()
+        elif command == "ponderhit":
+            self.ponderhit()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def loop(self, lines=sys.stdin):
+        for line in lines:
+            if not self.handle(line):
+                break
+        self.stop()
+
+
+def main():
+    UCI().loop()
+
+
+if __name__ == "__main__":
+    main()
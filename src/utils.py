@@ -38,5 +38,16 @@ def uci_to_coords(s):
     return ((fx, fy), (tx, ty))
 
 
+def packed_to_uci(packed):
+    frm, to = packed & 63, (packed >> 6) & 63
+    return f"{'abcdefgh'[frm & 7]}{8 - (frm >> 3)}{'abcdefgh'[to & 7]}{8 - (to >> 3)}"
+
+
+def uci_to_packed(s):
+    # squares only, flags need the board (moves.pack_with_flags)
+    (fx, fy), (tx, ty) = uci_to_coords(s)
+    return (fx * 8 + fy) | ((tx * 8 + ty) << 6)
+
+
 def clear_screen():
     os.system("clear")
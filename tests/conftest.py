@@ -0,0 +1,17 @@
+import pytest
+
+from src.backend.board import Board
+from src.backend.bitboard import BitboardBoard
+from src.tools.perft import SUITE
+
+FENS = [case["fen"] for case in SUITE]
+
+
+@pytest.fixture(params=[Board, BitboardBoard], ids=["list", "bitboard"])
+def board_class(request):
+    return request.param
+
+
+@pytest.fixture(params=FENS, ids=[case["name"] for case in SUITE])
+def fen(request):
+    return request.param
@@ -0,0 +1,23 @@
+from src.backend.api import API
+from src.engine.alphabeta import MATE_BOUND, AlphaBetaEngine
+
+
+def search(board_class, fen, depth):
+    api = API(board_class)
+    api.load_fen(fen)
+    engine = AlphaBetaEngine(api, time_limit=None, max_depth=depth)
+    move = engine.get_best_move()
+    return move, engine.best_score
+
+
+def test_mate_on_the_fiftieth_move_counts(board_class):
+    # Ra8 mates and brings the clock to 100 at the same time
+    move, score = search(board_class, "6k1/5ppp/8/8/8/8/8/R5K1 w - - 99 80", 3)
+    assert move == ((7, 0), (0, 0))
+    assert score >= MATE_BOUND
+
+
+def test_fifty_move_rule_draws(board_class):
+    # a rook up, but any quiet move ends the game in a draw
+    _, score = search(board_class, "7k/8/8/8/8/8/8/R5K1 w - - 99 80", 3)
+    assert score == 0
@@ -0,0 +1,46 @@
+import pytest
+
+from src.backend.api import API
+from src.backend.fen import board_from_fen
+from src.engine.alphabeta import AlphaBetaEngine
+from src.engine.evaluation import evaluate_full, taper
+
+pytest.importorskip("numpy")
+
+from src.engine.batched import BatchedAlphaBetaEngine, BatchEvaluator, encode
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "4k3/1P6/8/8/8/8/8/4K3 w - - 0 1",
+]
+
+
+def test_batch_scores_match_the_scalar_evaluation(board_class):
+    evaluator = BatchEvaluator()
+    boards = [board_from_fen(fen, board_class)[0] for fen in FENS]
+    scores = evaluator.score(evaluator.batch([encode(b) for b in boards]))
+    assert [int(s) for s in scores] == [
+        taper(*evaluate_full(b.board)) for b in boards
+    ]
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_batched_search_scores_like_the_plain_search(board_class, fen):
+    def root_score(engine_class):
+        api = API(board_class)
+        api.load_fen(fen)
+        # full width and no quiescence, both engines search the same tree
+        engine = engine_class(
+            api,
+            time_limit=None,
+            max_depth=3,
+            quiescence=False,
+            null_move=False,
+            lmr=False,
+        )
+        engine.get_best_move()
+        return engine.best_score
+
+    assert root_score(BatchedAlphaBetaEngine) == root_score(AlphaBetaEngine)
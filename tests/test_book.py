@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from src.backend.game import Game
+from src.engine.book import (
+    OpeningBook,
+    board_key,
+    decode_move,
+    encode_move,
+    polyglot_key,
+    write_book,
+)
+
+# the worked examples that come with the polyglot book format
+POLYGLOT_KEYS = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", 0x463B96181691FC9C),
+    ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1", 0x823C9B50FD114196),
+    ("rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 2", 0x0756B94461C50FB0),
+    ("rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 2", 0x662FAFB965DB29D4),
+    ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3", 0x22A48B5A8E47FF78),
+    ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR b kq - 0 3", 0x652A607CA3F242C1),
+    ("rnbq1bnr/ppp1pkpp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR w - - 0 4", 0x00FDD303C946BDD9),
+    ("rnbqkbnr/p1pppppp/8/8/PpP4P/8/1P1PPPP1/RNBQKBNR b KQkq c3 0 3", 0x3C8123EA7B067637),
+    ("rnbqkbnr/p1pppppp/8/8/P6P/R1p5/1P1PPPP1/1NBQKBNR b Kkq - 0 4", 0x5C3F9B829B279560),
+]
+
+
+@pytest.mark.parametrize("fen, key", POLYGLOT_KEYS)
+def test_polyglot_key(board_class, fen, key):
+    game = Game(board_class)
+    game.load_fen(fen)
+    assert polyglot_key(game) == key
+
+
+def test_moves_round_trip(board_class, fen):
+    game = Game(board_class)
+    game.load_fen(fen)
+    for move in game.legal_moves():
+        assert decode_move(game.board, encode_move(game.board, move)) == move
+
+
+def test_castling_is_written_as_the_king_taking_the_rook(board_class):
+    game = Game(board_class)
+    game.load_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    # e1h1 and e1a1
+    assert encode_move(game.board, ((7, 4), (7, 6))) == 7 | 4 << 6
+    assert encode_move(game.board, ((7, 4), (7, 2))) == 0 | 4 << 6
+
+
+@pytest.mark.parametrize("key_fn", [polyglot_key, board_key])
+def test_written_book_is_read_back(tmp_path, board_class, key_fn):
+    game = Game(board_class)
+    e4, d4 = ((6, 4), (4, 4)), ((6, 3), (4, 3))
+    key = key_fn(game)
+    weights = {
+        (key, encode_move(game.board, e4)): 30,
+        (key, encode_move(game.board, d4)): 10,
+        (key + 1, encode_move(game.board, d4)): 5,
+    }
+    path = tmp_path / "book.bin"
+    assert write_book(path, weights) == 3
+
+    with OpeningBook(path, key_fn=key_fn, rng=random.Random(0)) as book:
+        assert len(book) == 3
+        assert book.moves(game) == [(e4, 30), (d4, 10)]
+        assert book.choose(game, best=True) == e4
+        assert book.choose(game) in (e4, d4)
+        game.make_move(e4)
+        assert book.choose(game) is None
@@ -0,0 +1,55 @@
+import random
+
+from src.backend.fen import board_from_fen
+from src.backend.move_gen import getLegalMoves
+from src.engine.evaluation import IncrementalEval, evaluate_full
+
+
+def totals(ev):
+    return ev.mg, ev.eg, ev.phase
+
+
+def test_incremental_matches_full_on_random_walks(board_class, fen):
+    rng = random.Random(fen)
+    for _ in range(5):
+        board, turn, _, _ = board_from_fen(fen, board_class)
+        ev = IncrementalEval()
+        ev.attach(board)
+        played = []
+        for _ in range(40):
+            moves = getLegalMoves(board, turn)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            played.append((move, board.apply_move(move)))
+            assert totals(ev) == evaluate_full(board.board)
+            turn = "black" if turn == "white" else "white"
+        # and back again, every take-back restores the totals
+        for move, record in reversed(played):
+            board.undo_move(move, record)
+            assert totals(ev) == evaluate_full(board.board)
+        ev.detach()
+        assert board.evaluator is None
+
+
+def test_incremental_matches_full_below_every_root_move(board_class, fen):
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    ev = IncrementalEval()
+    ev.attach(board)
+    other = "black" if turn == "white" else "white"
+    for move in getLegalMoves(board, turn):
+        record = board.apply_move(move)
+        for reply in getLegalMoves(board, other):
+            reply_record = board.apply_move(reply)
+            assert totals(ev) == evaluate_full(board.board)
+            board.undo_move(reply, reply_record)
+        board.undo_move(move, record)
+    assert totals(ev) == evaluate_full(board.board)
+
+
+def test_evaluate_is_from_the_side_to_move(board_class):
+    board, _, _, _ = board_from_fen("4k3/8/8/8/8/8/8/Q3K3 w - - 0 1", board_class)
+    ev = IncrementalEval()
+    ev.attach(board)
+    assert ev.evaluate("white") > 800
+    assert ev.evaluate("black") == -ev.evaluate("white")
@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from src.backend.api import API
+from src.backend.fen import STARTING_FEN, board_from_fen, board_to_fen, parse_fen
+from src.backend.game import Game
+from src.backend.move_gen import getLegalMoves
+from src.backend.san import move_to_san, san_to_move
+
+
+def test_fen_round_trip(board_class, fen):
+    board, turn, halfmove, fullmove = board_from_fen(fen, board_class)
+    text = board_to_fen(board, turn, halfmove, fullmove)
+    # epd style suite entries leave the clocks out
+    assert text.split()[: len(fen.split())] == fen.split()
+    again, *_ = board_from_fen(text, board_class)
+    assert again.board == board.board
+    assert again.hash == board.hash
+
+
+def test_game_fen_follows_play(board_class):
+    game = Game(board_class)
+    assert game.to_fen() == STARTING_FEN
+    game.make_move(((6, 4), (4, 4)))
+    assert game.to_fen() == (
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+    )
+    game.make_move(((0, 6), (2, 5)))
+    assert game.to_fen() == (
+        "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2"
+    )
+
+
+def test_fen_round_trips_through_random_games(board_class, fen):
+    rng = random.Random(fen)
+    game = Game(board_class)
+    game.load_fen(fen)
+    for _ in range(30):
+        if game.game_over:
+            break
+        game.make_move(rng.choice(game.legal_moves()))
+        copy = Game(board_class)
+        copy.load_fen(game.to_fen())
+        assert copy.to_fen() == game.to_fen()
+        assert copy.board.hash == game.board.hash
+        assert sorted(copy.legal_moves()) == sorted(game.legal_moves())
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        "",
+        "8/8/8/8/8/8/8 w - - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1",
+        # no kings, two white kings, the side not to move in check
+        "8/8/8/8/8/8/8/8 w - - 0 1",
+        "k7/8/8/8/8/8/8/K6K w - - 0 1",
+        "k6R/8/8/8/8/8/8/K7 w - - 0 1",
+        # negative clocks
+        "k7/8/8/8/8/8/8/K7 w - - -1 1",
+        "k7/8/8/8/8/8/8/K7 w - - 0 -1",
+        # en passant squares off the board, on the wrong rank or with no pawn
+        # that could just have made a double push
+        "4k3/8/8/8/8/8/8/4K3 w - e1 0 1",
+        "4k3/8/8/8/8/8/8/4K3 w - e0 0 1",
+        "4k3/8/8/8/8/8/8/4K3 w - e9 0 1",
+        "4k3/8/8/8/8/8/8/4K3 w - e10 0 1",
+        "4k3/8/8/8/8/8/8/4K3 w - e6 0 1",
+        "4k3/8/8/4p3/8/8/8/4K3 w - e3 0 1",
+        "4k3/8/8/4p3/8/8/8/4K3 b - e6 0 1",
+        "4k3/8/8/8/4P3/8/8/4K3 w - e3 0 1",
+        # pawns on the first or last rank
+        "P3k3/8/8/8/8/8/8/4K3 w - - 0 1",
+        "4k3/8/8/8/8/8/8/p3K3 w - - 0 1",
+    ],
+)
+def test_bad_fens_are_rejected(bad):
+    with pytest.raises(ValueError):
+        parse_fen(bad)
+
+
+def test_a_bad_fen_leaves_the_game_alone(board_class):
+    api = API(board_class)
+    api.make_move(((6, 4), (4, 4)))
+    before = api.get_fen()
+    with pytest.raises(ValueError):
+        api.load_fen("k7/8/8/8/8/8/8/K6K w - - 0 1")
+    assert api.get_fen() == before
+
+
+def test_san_round_trip(board_class, fen):
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    legal = getLegalMoves(board, turn)
+    for move in legal:
+        san = move_to_san(board, turn, move, legal)
+        assert san_to_move(board, turn, san) == move
+
+
+def test_san_round_trips_through_random_games(board_class):
+    rng = random.Random(7)
+    for _ in range(5):
+        game = Game(board_class)
+        for _ in range(80):
+            if game.game_over:
+                break
+            legal = game.legal_moves()
+            move = rng.choice(legal)
+            san = move_to_san(game.board, game.turn, move, legal)
+            assert san_to_move(game.board, game.turn, san) == move
+            game.make_move(move)
+
+
+def test_san_text(board_class):
+    board, turn, _, _ = board_from_fen(
+        "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", board_class
+    )
+    assert move_to_san(board, turn, ((7, 4), (7, 6))) == "O-O"
+    assert move_to_san(board, turn, ((7, 0), (0, 0))) == "Rxa8+"
+    assert san_to_move(board, turn, "0-0-0") == ((7, 4), (7, 2))
+    assert san_to_move(board, turn, "Rb1") == ((7, 0), (7, 1))
@@ -0,0 +1,50 @@
+from src.backend.fen import parse_fen
+from src.backend.game import Game
+from src.backend.move_gen import getLegalMoves
+
+
+def fresh_moves(game):
+    return sorted(getLegalMoves(game.board, game.turn))
+
+
+def test_legal_moves_is_a_copy(board_class):
+    game = Game(board_class)
+    moves = game.legal_moves()
+    assert len(moves) == 20
+    moves.clear()
+    assert len(game.legal_moves()) == 20
+    assert game.is_legal(((6, 4), (4, 4)))
+    assert not game.is_legal(((6, 4), (3, 4)))
+
+
+def test_cache_follows_moves_and_undo(board_class):
+    game = Game(board_class)
+    start = game.legal_moves()
+    game.make_move(((6, 4), (4, 4)))
+    assert sorted(game.legal_moves()) == fresh_moves(game)
+    assert game.is_legal(((1, 4), (3, 4)))
+    assert not game.is_legal(((6, 3), (4, 3)))
+    game.undo()
+    assert game.legal_moves() == start
+    game.redo()
+    assert sorted(game.legal_moves()) == fresh_moves(game)
+
+
+def test_cache_follows_load_fen(board_class):
+    game = Game(board_class)
+    game.legal_moves()
+    game.load_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+    assert sorted(game.legal_moves()) == fresh_moves(game)
+    assert game.is_legal(((7, 4), (7, 6)))
+
+
+def test_invalidate_moves_after_editing_the_board(board_class):
+    game = Game(board_class)
+    game.load_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+    assert game.is_legal(((7, 4), (7, 6)))
+    # set up a new position behind the game's back, no castling this time
+    matrix, _, _, _, _, _ = parse_fen("4k3/8/8/8/8/8/8/4K2R w - - 0 1")
+    game.board.set_position(matrix, True, 0, None)
+    game.invalidate_moves()
+    assert not game.is_legal(((7, 4), (7, 6)))
+    assert sorted(game.legal_moves()) == fresh_moves(game)
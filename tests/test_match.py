@@ -0,0 +1,21 @@
+from src.tools.match import engine_label, parse_engine, sprt_bounds, sprt_llr
+
+
+def test_one_sided_runs_end_the_sprt():
+    lower, upper = sprt_bounds(0.05, 0.05)
+    assert sprt_llr(4, 0, 0, 0, 10) > 0
+    assert sprt_llr(0, 0, 4, 0, 10) < 0
+    assert sprt_llr(40, 0, 0, 0, 10) >= upper
+    assert sprt_llr(0, 0, 40, 0, 10) <= lower
+    assert sprt_llr(0, 0, 0, 0, 10) == 0
+
+
+def test_llr_follows_the_score():
+    assert sprt_llr(60, 20, 20, 0, 10) > sprt_llr(40, 20, 40, 0, 10)
+    assert sprt_llr(40, 20, 40, 0, 10) < 0
+
+
+def test_engine_labels_read_back():
+    spec = "alphabeta:time_limit=0.1,tt_mb=4"
+    assert engine_label(parse_engine(spec)) == spec
+    assert engine_label(parse_engine("random")) == "random"
@@ -0,0 +1,47 @@
+from src.backend.api import API
+from src.engine.alphabeta import MATE
+from src.engine.minmax import MinimaxEngine
+
+
+def test_mate_scores_are_ply_relative_in_the_tt(board_class):
+    api = API(board_class)
+    api.load_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    engine = MinimaxEngine(api, depth=3)
+    pos = api.position()
+    engine.turn = pos.turn
+    engine.eval.attach(pos.board)
+    # Ra8 mates in one ply, whichever depth the table was filled at
+    assert engine.minimax(pos, 3, True) == MATE - 1
+    assert engine.minimax(pos, 1, True) == MATE - 1
+    assert engine.minimax(pos, 2, True) == MATE - 1
+    engine.eval.detach()
+
+
+def test_plays_the_mate(board_class):
+    api = API(board_class)
+    api.load_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    assert MinimaxEngine(api, depth=3).get_best_move() == ((7, 0), (0, 0))
+
+
+def test_fifty_move_draw_is_checked_before_the_tt(board_class):
+    api = API(board_class)
+    engine = MinimaxEngine(api, depth=2)
+    for clock, expected in ((0, MATE - 1), (100, 0)):
+        api.load_fen(f"6k1/5ppp/8/8/8/8/8/R5K1 w - - {clock} 1")
+        pos = api.position()
+        engine.turn = pos.turn
+        engine.eval.attach(pos.board)
+        # same hash both times, the clock has to win over the stored mate
+        assert engine.minimax(pos, 2, True) == expected
+        engine.eval.detach()
+
+
+def test_mate_on_the_hundredth_half_move_is_still_mate(board_class):
+    api = API(board_class)
+    api.load_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 100 1")
+    engine = MinimaxEngine(api, depth=2)
+    pos = api.position()
+    engine.turn = "white"
+    engine.eval.attach(pos.board)
+    assert engine.minimax(pos, 2, False) == MATE - pos.ply
+    engine.eval.detach()
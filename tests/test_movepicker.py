@@ -0,0 +1,68 @@
+from src.backend.fen import board_from_fen
+from src.backend.move_gen import getLegalMovesPacked
+from src.backend.moves import CAPTURE, SQUARE_MASK
+from src.engine.movepicker import MoveOrderer, staged_moves
+
+
+def test_every_legal_move_exactly_once(board_class, fen):
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    moves = list(staged_moves(board, turn))
+    assert len(moves) == len(set(moves))
+    assert sorted(moves) == sorted(getLegalMovesPacked(board, turn))
+
+
+def test_hash_move_first_then_captures(board_class):
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    legal = getLegalMovesPacked(board, turn)
+    quiet = next(m for m in legal if not m & CAPTURE)
+    moves = list(staged_moves(board, turn, hash_move=quiet & SQUARE_MASK))
+    assert moves[0] == quiet
+    assert sorted(moves) == sorted(legal)
+    flags = [bool(m & CAPTURE) for m in moves[1:]]
+    # all the captures, then nothing but quiet moves
+    assert flags == sorted(flags, reverse=True)
+
+
+def test_a_hash_move_that_does_not_fit_is_skipped(board_class):
+    board, turn, _, _ = board_from_fen(
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", board_class
+    )
+    # a black pawn move with white to play
+    bogus = 1 * 8 + 4 | (3 * 8 + 4) << 6
+    moves = list(staged_moves(board, turn, hash_move=bogus))
+    assert sorted(moves) == sorted(getLegalMovesPacked(board, turn))
+
+
+def test_killers_follow_the_captures_and_are_not_repeated(board_class):
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    legal = getLegalMovesPacked(board, turn)
+    captures = sum(1 for m in legal if m & CAPTURE)
+    quiets = [m for m in legal if not m & CAPTURE]
+    killer = quiets[-1] & SQUARE_MASK
+    moves = list(staged_moves(board, turn, killers=(killer, killer)))
+    assert len(moves) == len(set(moves)) == len(legal)
+    assert moves[captures] & SQUARE_MASK == killer
+
+
+def test_move_orderer_uses_killers_and_history(board_class):
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    legal = getLegalMovesPacked(board, turn)
+    captures = sum(1 for m in legal if m & CAPTURE)
+    quiets = [m & SQUARE_MASK for m in legal if not m & CAPTURE]
+    orderer = MoveOrderer()
+    orderer.cutoff(turn, quiets[-1], 3, 2)
+    orderer.cutoff(turn, quiets[-2], 5, 4)
+    # a killer at ply 2, history everywhere
+    moves = [m & SQUARE_MASK for m in orderer.moves(board, turn, 2)]
+    assert moves[captures] == quiets[-1]
+    assert moves[captures + 1] == quiets[-2]
+    moves = [m & SQUARE_MASK for m in orderer.moves(board, turn, 3)]
+    assert moves[captures : captures + 2] == [quiets[-2], quiets[-1]]
+    assert len(moves) == len(set(moves)) == len(legal)
+
+    orderer.new_search()
+    assert orderer.killers[2] == [0, 0]
+    assert orderer.history[turn][quiets[-2]] == 25 >> 1
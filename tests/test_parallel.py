@@ -0,0 +1,33 @@
+from src.backend.api import API
+from src.engine import parallel
+from src.engine.parallel import ParallelEngine
+from src.server import engine_move
+
+
+def test_pool_starts_with_the_engine():
+    api = API()
+    api.load_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    engine = ParallelEngine(api, workers=2, max_depth=3, time_limit=None)
+    try:
+        # the workers are up before the first search starts its clock
+        assert engine.pool is not None
+        assert engine.get_best_move() == ((7, 0), (0, 0))
+    finally:
+        engine.close()
+    assert engine.pool is None
+
+
+def test_single_worker_needs_no_pool():
+    api = API()
+    engine = ParallelEngine(api, workers=1, max_depth=2, time_limit=None)
+    assert engine.pool is None
+    assert api.is_legal(engine.get_best_move())
+
+
+def test_server_moves_reuse_the_worker_engine():
+    fen = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+    assert engine_move(fen, None, 3) == "a1a8"
+    engine = parallel._worker_engine
+    assert engine is not None
+    assert engine_move(fen, None, 3) == "a1a8"
+    assert parallel._worker_engine is engine
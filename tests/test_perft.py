@@ -0,0 +1,18 @@
+import pytest
+
+from src.tools.perft import SUITE, perft
+
+# every depth of the reference suite up to this many leaf nodes
+MAX_NODES = 20000
+
+CASES = [
+    pytest.param(case["fen"], depth, count, id=f"{case['name']}-{depth}")
+    for case in SUITE
+    for depth, count in enumerate(case["counts"], 1)
+    if count <= MAX_NODES
+]
+
+
+@pytest.mark.parametrize("fen, depth, count", CASES)
+def test_perft(board_class, fen, depth, count):
+    assert perft(depth, fen, board_class) == count
@@ -0,0 +1,80 @@
+import pytest
+
+from src.backend.api import API
+from src.backend.bitboard import BitboardBoard
+from src.backend.fen import board_from_fen
+from src.backend.move_gen import getLegalMovesPacked
+from src.engine.alphabeta import AlphaBetaEngine
+from src.engine.evaluation import IncrementalEval
+from src.engine.quiescence import MATE, quiescence, see
+
+
+def square(name):
+    return (8 - int(name[1])) * 8 + "abcdefgh".index(name[0])
+
+
+def capture(board, color, frm, to):
+    for move in getLegalMovesPacked(board, color, quiets=False):
+        if move & 63 == square(frm) and (move >> 6) & 63 == square(to):
+            return move
+    raise AssertionError(f"no capture {frm}{to}")
+
+
+@pytest.mark.parametrize(
+    "fen, frm, to, value",
+    [
+        # free pawn, defended pawn, a battery that wins the pawn in the end
+        ("4k3/8/8/3p4/8/8/8/3RK3 w - - 0 1", "d1", "d5", 100),
+        ("4k3/8/4p3/3p4/8/8/8/3RK3 w - - 0 1", "d1", "d5", -400),
+        ("3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", "d2", "d5", 100),
+        ("4k3/8/4p3/3p4/8/2N5/8/4K3 w - - 0 1", "c3", "d5", 100 - 320),
+        # en passant, the taken pawn is not on the target square
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5", "d6", 100),
+        ("4k3/2p5/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5", "d6", 0),
+    ],
+)
+def test_see(board_class, fen, frm, to, value):
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    before = [row[:] for row in board.board]
+    assert see(board, capture(board, turn, frm, to)) == value
+    assert board.board == before
+
+
+def test_see_leaves_the_bitboard_matrix_unbuilt():
+    board, turn, _, _ = board_from_fen(
+        "3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", BitboardBoard
+    )
+    move = capture(board, turn, "d2", "d5")
+    board._matrix = None
+    see(board, move)
+    assert board._matrix is None
+
+
+def qsearch(board_class, fen):
+    api = API(board_class)
+    api.load_fen(fen)
+    pos = api.position()
+    ev = IncrementalEval()
+    ev.attach(pos.board)
+    return quiescence(pos, ev.evaluate, -MATE - 1, MATE + 1)
+
+
+def test_quiescence_sees_mate(board_class):
+    # black after Ra8#, no standing pat on a lost position
+    assert qsearch(board_class, "R5k1/5ppp/8/8/8/8/8/6K1 b - - 1 1") == -MATE
+
+
+def test_quiescence_searches_quiet_evasions(board_class):
+    # in check, where only quiet king moves get out of it, or nothing does
+    score = qsearch(board_class, "R6k/8/7K/8/8/8/8/8 b - - 0 1")
+    assert score == -MATE
+    score = qsearch(board_class, "R5k1/8/8/8/8/8/8/6K1 b - - 0 1")
+    assert -MATE < score < 0
+
+
+def test_depth_one_search_finds_mate_in_one(board_class):
+    api = API(board_class)
+    api.load_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    engine = AlphaBetaEngine(api, time_limit=None, max_depth=1)
+    assert engine.get_best_move() == ((7, 0), (0, 0))
+    assert engine.best_score == MATE - 1
@@ -0,0 +1,67 @@
+import pytest
+
+from src.backend.api import API
+from src.backend.fen import board_to_fen
+from src.backend.position import Position
+from src.engine.alphabeta import AlphaBetaEngine
+
+
+def test_null_move_is_taken_back(board_class):
+    api = API(board_class)
+    # white to move with an en passant capture on offer
+    api.load_fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2")
+    pos = api.position()
+    before = (board_to_fen(pos.board, pos.turn), pos.hash, pos.halfmove_clock)
+    pos.push_null()
+    assert pos.turn == "black"
+    assert pos.board.ep_square is None
+    assert pos.hash != before[1]
+    pos.pop()
+    assert (board_to_fen(pos.board, pos.turn), pos.hash, pos.halfmove_clock) == before
+    assert pos.ply == 0
+
+
+@pytest.mark.parametrize(
+    "fen, move",
+    [
+        # back rank mate
+        ("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", ((7, 0), (0, 0))),
+        # the queen hangs to the knight
+        ("4k3/8/8/3q4/8/4N3/8/4K3 w - - 0 1", ((5, 4), (3, 3))),
+        # the rook hangs to the bishop, black to move
+        ("4k3/8/2b5/8/8/8/6R1/4K3 b - - 0 1", ((2, 2), (6, 6))),
+    ],
+)
+def test_selective_search_finds_what_full_width_does(board_class, fen, move):
+    results = []
+    for selective in (False, True):
+        api = API(board_class)
+        api.load_fen(fen)
+        engine = AlphaBetaEngine(
+            api, time_limit=None, max_depth=4, null_move=selective, lmr=selective
+        )
+        results.append(engine.get_best_move())
+    assert results == [move, move]
+
+
+@pytest.mark.parametrize(
+    "fen, tried",
+    [
+        ("4k3/8/8/3q4/8/4N3/8/4K3 w - - 0 1", True),
+        # only kings and pawns, where passing is often the better move
+        ("4k3/4p3/8/8/8/8/4P3/4K3 w - - 0 1", False),
+    ],
+)
+def test_null_move_needs_pieces(board_class, monkeypatch, fen, tried):
+    calls = []
+    push_null = Position.push_null
+
+    def counting(pos):
+        calls.append(pos.turn)
+        push_null(pos)
+
+    monkeypatch.setattr(Position, "push_null", counting)
+    api = API(board_class)
+    api.load_fen(fen)
+    AlphaBetaEngine(api, time_limit=None, max_depth=5).get_best_move()
+    assert bool(calls) == tried
@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import pytest
+
+from src.server import GameServer
+
+
+async def call(server, method, path, body=None):
+    messages = [{"body": b"" if body is None else json.dumps(body).encode()}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await server({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def new_game(server, body=None):
+    status, game = await call(server, "POST", "/games", body)
+    assert status == 201
+    return f"/games/{game['id']}"
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        5,
+        ["not", "a", "fen"],
+        "garbage",
+        "4k3/8/8/8/8/8/8/4K3 w - e1 0 1",
+        "P3k3/8/8/8/8/8/8/4K3 w - - 0 1",
+    ],
+)
+def test_bad_fens_get_a_400(fen):
+    async def go():
+        server = GameServer(workers=1)
+        try:
+            return await call(server, "POST", "/games", {"fen": fen})
+        finally:
+            await server.stop()
+
+    status, body = run(go())
+    assert status == 400
+    assert "error" in body
+
+
+@pytest.mark.parametrize("move", ["e2e4zzz", "e7e8n", "e2", "z9z9", 42, None])
+def test_bad_move_text_gets_a_400(move):
+    async def go():
+        server = GameServer(workers=1)
+        try:
+            path = await new_game(server)
+            return await call(server, "POST", path + "/move", {"move": move})
+        finally:
+            await server.stop()
+
+    status, _ = run(go())
+    assert status == 400
+
+
+def test_moves_undo_and_redo():
+    async def go():
+        server = GameServer(workers=1)
+        try:
+            path = await new_game(server)
+            status, state = await call(server, "POST", path + "/move", {"move": "e2e4"})
+            assert status == 200
+            assert state["turn"] == "black"
+            status, legal = await call(server, "GET", path + "/moves")
+            assert status == 200 and len(legal["moves"]) == 20
+            assert (await call(server, "POST", path + "/undo"))[0] == 200
+            assert (await call(server, "POST", path + "/undo"))[0] == 409
+            assert (await call(server, "POST", path + "/redo"))[0] == 200
+            assert (await call(server, "DELETE", path))[0] == 200
+            assert (await call(server, "GET", path))[0] == 404
+        finally:
+            await server.stop()
+
+    run(go())
+
+
+@pytest.mark.parametrize(
+    "body", [{"time": "nan"}, {"time": float("inf")}, {"depth": 0}, {"depth": -3}]
+)
+def test_bad_engine_limits_get_a_400(body):
+    async def go():
+        server = GameServer(workers=1)
+        try:
+            path = await new_game(server)
+            return await call(server, "POST", path + "/engine", body)
+        finally:
+            await server.stop()
+
+    assert run(go())[0] == 400
+
+
+def test_errors_are_answered_in_json():
+    async def go():
+        server = GameServer(workers=1)
+
+        async def broken(*args):
+            raise RuntimeError("boom")
+
+        server.route = broken
+        try:
+            return await call(server, "GET", "/health")
+        finally:
+            await server.stop()
+
+    status, body = run(go())
+    assert status == 500
+    assert "error" in body
+
+
+def test_engine_move():
+    async def go():
+        server = GameServer(workers=1)
+        try:
+            path = await new_game(server)
+            return await call(
+                server, "POST", path + "/engine", {"time": 0.2, "depth": 2}
+            )
+        finally:
+            await server.stop()
+
+    status, state = run(go())
+    assert status == 200
+    assert state["turn"] == "black"
@@ -0,0 +1,42 @@
+from src.engine.tt import EXACT, LOWER, TranspositionTable
+
+
+def test_store_and_probe():
+    tt = TranspositionTable(1)
+    tt.store(12345, 4, -37, LOWER, ((6, 4), (4, 4)))
+    depth, score, bound, move = tt.probe(12345)
+    assert (depth, score, bound) == (4, -37, LOWER)
+    assert move is not None
+    assert tt.probe(54321) is None
+
+
+def test_deeper_entry_is_kept_and_the_shallower_one_still_found():
+    tt = TranspositionTable(1)
+    # same bucket, different keys
+    a, b = 7, 7 + tt.buckets
+    tt.store(a, 6, 10, EXACT)
+    tt.store(b, 2, 20, EXACT)
+    assert tt.probe(a)[:2] == (6, 10)
+    assert tt.probe(b)[:2] == (2, 20)
+    # a deeper search takes slot 0 and pushes the old entry into slot 1
+    c = 7 + 2 * tt.buckets
+    tt.store(c, 8, 30, EXACT)
+    assert tt.probe(c)[:2] == (8, 30)
+    assert tt.probe(a)[:2] == (6, 10)
+    assert tt.probe(b) is None
+
+
+def test_fractional_sizes():
+    tt = TranspositionTable(0.5)
+    assert tt.buckets == 512 * 1024 // 32
+    tt.store(99, 1, 5, EXACT)
+    assert tt.probe(99)[1] == 5
+    assert TranspositionTable(0.00001).buckets == 1
+
+
+def test_clear():
+    tt = TranspositionTable(1)
+    tt.store(99, 1, 5, EXACT)
+    tt.clear()
+    assert tt.probe(99) is None
+    assert tt.hashfull() == 0
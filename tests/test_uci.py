@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+from src.uci import UCI, parse_move, time_budget
+
+
+def run(*lines):
+    out = io.StringIO()
+    uci = UCI(out)
+    for line in lines:
+        uci.handle(line)
+    uci.stop()
+    return uci, out.getvalue().splitlines()
+
+
+def test_parse_move():
+    assert parse_move("e2e4") == ((6, 4), (4, 4))
+    assert parse_move("e7e8q") == ((1, 4), (0, 4))
+    for text in ("e7e8n", "e2e4xyz", "e2e", "i2i4", "e0e4", ""):
+        with pytest.raises(ValueError):
+            parse_move(text)
+
+
+def test_time_budget():
+    assert time_budget({"movetime": 1000}, "white") == pytest.approx(0.95)
+    assert time_budget({}, "white") is None
+    # no moves to go is read as one, not a division by zero
+    assert time_budget({"wtime": 1000, "movestogo": 0}, "white") > 0
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "position fen garbage",
+        "position fen 4k3/8/8/8/8/8/8/4K3 w - e1 0 1",
+        "position startpos moves e2e4 e7e5n",
+        "position startpos moves e2e4xyz",
+        "setoption name Hash value x",
+    ],
+)
+def test_bad_input_is_reported(line):
+    _, lines = run(line)
+    assert lines and lines[-1].startswith("info string")
+
+
+def test_a_bad_move_stops_the_move_list():
+    uci, _ = run("position startpos moves e2e4 e7e8n d7d5")
+    assert uci.api.get_fen().split()[0] == (
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR"
+    )
+
+
+def test_go_with_bad_numbers_still_answers():
+    _, lines = run(
+        "position startpos", "go wtime abc depth 1", "go wtime 1000 movestogo 0"
+    )
+    assert any(line.startswith("info string invalid wtime") for line in lines)
+    assert sum(line.startswith("bestmove") for line in lines) == 2
+
+
+def test_stop_right_after_go_infinite():
+    uci, lines = run("position startpos", "go infinite", "stop")
+    assert uci.engine.stopped
+    assert lines[-1].startswith("bestmove")
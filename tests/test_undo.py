@@ -0,0 +1,84 @@
+import random
+
+from src.backend.api import API
+from src.backend.game import Game
+
+
+def snapshot(game):
+    board = game.board
+    return (
+        game.to_fen(),
+        board.hash,
+        [row[:] for row in board.board],
+        board.wking_pos,
+        board.bking_pos,
+        game.turn,
+        game.game_over,
+        game.result,
+    )
+
+
+def play_random(game, rng, plies):
+    states = [snapshot(game)]
+    for _ in range(plies):
+        if game.game_over:
+            break
+        game.make_move(rng.choice(game.legal_moves()))
+        states.append(snapshot(game))
+    return states
+
+
+def test_undo_and_redo_restore_every_state(board_class, fen):
+    rng = random.Random(fen)
+    game = Game(board_class)
+    game.load_fen(fen)
+    states = play_random(game, rng, 40)
+
+    for state in reversed(states[:-1]):
+        assert game.undo()
+        assert snapshot(game) == state
+    assert not game.undo()
+    assert not game.can_undo()
+
+    for state in states[1:]:
+        assert game.redo()
+        assert snapshot(game) == state
+    assert not game.redo()
+
+
+def test_a_new_move_clears_the_redo_stack(board_class):
+    game = Game(board_class)
+    game.make_move(((6, 4), (4, 4)))
+    assert game.undo()
+    assert game.can_redo()
+    game.make_move(((6, 3), (4, 3)))
+    assert not game.can_redo()
+
+
+def test_undo_takes_back_a_mate(board_class):
+    game = Game(board_class)
+    for move in [((6, 5), (5, 5)), ((1, 4), (3, 4)), ((6, 6), (4, 6))]:
+        game.make_move(move)
+    game.make_move(((0, 3), (4, 7)))
+    assert game.game_over
+    assert game.undo()
+    assert not game.game_over
+    assert game.result is None
+    assert game.redo()
+    assert game.game_over
+
+
+def test_search_position_push_pop_leaves_the_game_alone(board_class, fen):
+    rng = random.Random(fen)
+    api = API(board_class)
+    api.load_fen(fen)
+    before = snapshot(api.g)
+    pos = api.position()
+    for _ in range(30):
+        moves = pos.legal_moves_packed()
+        if not moves:
+            break
+        pos.push_packed(rng.choice(moves))
+    while pos.stack:
+        pos.pop()
+    assert snapshot(api.g) == before
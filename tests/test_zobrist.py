@@ -0,0 +1,77 @@
+import random
+
+from src.backend.fen import board_from_fen
+from src.backend.move_gen import getLegalMoves
+from src.backend.zobrist import compute_hash
+
+
+def full_hash(board, turn):
+    return compute_hash(board.board, turn == "white", board.castling, board.ep_square)
+
+
+def test_incremental_hash_matches_recompute(board_class, fen):
+    rng = random.Random(fen)
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    assert board.hash == full_hash(board, turn)
+    played = []
+    for _ in range(60):
+        moves = getLegalMoves(board, turn)
+        if not moves:
+            break
+        move = rng.choice(moves)
+        played.append((move, board.apply_move(move), board.hash))
+        turn = "black" if turn == "white" else "white"
+        assert board.hash == full_hash(board, turn)
+    for move, record, key in reversed(played):
+        assert board.hash == key
+        board.undo_move(move, record)
+
+
+def test_transpositions_share_a_hash(board_class):
+    board, _, _, _ = board_from_fen(
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", board_class
+    )
+    keys = []
+    for order in (["g1f3", "g8f6", "b1c3"], ["b1c3", "g8f6", "g1f3"]):
+        records = []
+        for text in order:
+            move = (
+                (8 - int(text[1]), "abcdefgh".index(text[0])),
+                (8 - int(text[3]), "abcdefgh".index(text[2])),
+            )
+            records.append((move, board.apply_move(move)))
+        keys.append(board.hash)
+        for move, record in reversed(records):
+            board.undo_move(move, record)
+    assert keys[0] == keys[1]
+
+
+def test_side_castling_and_en_passant_change_the_hash(board_class):
+    base = "r3k2r/8/8/8/4p3/8/3P4/R3K2R w KQkq - 0 1"
+    keys = {
+        board_from_fen(fen, board_class)[0].hash
+        for fen in (
+            base,
+            base.replace(" w ", " b "),
+            base.replace("KQkq", "Kkq"),
+            base.replace("KQkq", "-"),
+        )
+    }
+    assert len(keys) == 4
+
+    board, _, _, _ = board_from_fen(base, board_class)
+    record = board.apply_move(((6, 3), (4, 3)))
+    assert board.ep_square == (5, 3)
+    assert board.hash == full_hash(board, "black")
+    board.undo_move(((6, 3), (4, 3)), record)
+    assert board.hash == full_hash(board, "white")
+
+
+def test_null_move_restores_the_hash(board_class, fen):
+    board, turn, _, _ = board_from_fen(fen, board_class)
+    key = board.hash
+    other = "black" if turn == "white" else "white"
+    ep_square = board.apply_null()
+    assert board.hash == full_hash(board, other)
+    board.undo_null(ep_square)
+    assert board.hash == key